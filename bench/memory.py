@@ -0,0 +1,78 @@
+# --- Memory of the loaded task list: plain dicts (the original app) vs the slotted model ---
+# python bench/memory.py [--tasks 25000] [--subtasks 4] [--projects 50]
+# Both loaders read the same rows from an in-memory SQLite table, so what is measured is
+# only what stays alive afterwards: the task list a session keeps in st.session_state.
+import argparse
+import gc
+import json
+import sqlite3
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tracker.model import Status, Task, extract_subtasks
+
+STATUSES = [Status.NOT_STARTED, Status.IN_PROGRESS, Status.COMPLETED]
+
+
+def build_rows(conn, tasks, subtasks, projects):
+    conn.execute("CREATE TABLE tasks (project TEXT, task TEXT, description TEXT, status TEXT, subtasks TEXT)")
+    rows = []
+    for index in range(tasks):
+        description = "\n".join(
+            f"{(step % 12) + 1:02d}{(index + step) % 28 + 1:02d}: step {step + 1} of protocol {index}"
+            for step in range(subtasks))
+        subs = extract_subtasks(description)
+        for step, sub in enumerate(subs):
+            sub.status = STATUSES[(index + step) % len(STATUSES)]
+        rows.append((f"Project {index % projects}", f"Task {index}", description,
+                     str(Status.IN_PROGRESS), json.dumps([sub.to_dict() for sub in subs])))
+    conn.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def load_dicts(conn):
+    # The original app's shape: one dict per task, date_code and date_str on every subtask
+    return [
+        {"project": project, "task": task, "description": description, "status": status,
+         "subtasks": json.loads(subtasks) if subtasks else []}
+        for project, task, description, status, subtasks in conn.execute("SELECT * FROM tasks")
+    ]
+
+
+def load_model(conn):
+    return [
+        Task.from_record(project, task, description, status, json.loads(subtasks) if subtasks else [])
+        for project, task, description, status, subtasks in conn.execute("SELECT * FROM tasks")
+    ]
+
+
+def retained_bytes(loader, conn):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = loader(conn)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, len(tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=25000)
+    parser.add_argument("--subtasks", type=int, default=4)
+    parser.add_argument("--projects", type=int, default=50)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(":memory:")
+    build_rows(conn, args.tasks, args.subtasks, args.projects)
+    print(f"{args.tasks} tasks x {args.subtasks} subtasks ({args.tasks * args.subtasks} subtasks)")
+    for name, loader in (("plain dicts", load_dicts), ("slotted model", load_model)):
+        size, count = retained_bytes(loader, conn)
+        print(f"  {name:<14} {size / 1e6:6.1f} MB · {size / count:6.0f} bytes per task")
+
+
+if __name__ == "__main__":
+    main()
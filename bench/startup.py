@@ -0,0 +1,69 @@
+# --- Startup / rerun timing of the Streamlit apps, run headless with AppTest ---
+# python bench/startup.py [app.py] [--page 1] [--runs 20]
+# One app per invocation, so "first run" includes its imports. Every run starts from an empty
+# database in a fresh temporary directory: the main app keeps its replica in the working
+# directory, and a launcher (which stores next to itself) is run from a copy placed there.
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["pandas", "numpy", "dropbox", "requests"]
+
+
+def time_app(path, page, runs):
+    at = AppTest.from_file(str(path), default_timeout=60)
+    at.query_params["page"] = page
+    started = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"{path}: {at.exception[0].message}")
+    reruns = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - started)
+    return first, reruns
+
+
+def stage_app(path, workdir):
+    # The app to run from workdir: a launcher is copied into a folder of its own there, next
+    # to links to the real app.py and tracker/, so its database and tasks.db paths are fresh
+    if path == ROOT / "app.py":
+        return path
+    for name in ("app.py", "tracker"):
+        os.symlink(ROOT / name, Path(workdir) / name)
+    staged = Path(workdir) / path.parent.name / path.name
+    staged.parent.mkdir()
+    shutil.copy(path, staged)
+    return staged
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("app", nargs="?", default=str(ROOT / "app.py"))
+    parser.add_argument("--page", default="1")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    path = Path(args.app).resolve()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        first, reruns = time_app(stage_app(path, workdir), args.page, args.runs)
+        os.chdir(ROOT)
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"{path.relative_to(ROOT)} (page {args.page}): first run {first * 1000:.0f} ms · "
+          f"rerun median {statistics.median(reruns) * 1000:.1f} ms (max {max(reruns) * 1000:.1f} ms) · "
+          f"heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
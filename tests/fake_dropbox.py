@@ -0,0 +1,79 @@
+# --- In-memory stand-in for the dropbox.Dropbox calls the sync engine makes ---
+import itertools
+from types import SimpleNamespace
+
+import dropbox
+
+
+def not_found():
+    return dropbox.exceptions.ApiError("request", "not_found", "path not found", "en")
+
+
+def conflict():
+    # What an add or update to a file that exists or moved on gets back
+    write_failed = dropbox.files.UploadWriteFailed(
+        reason=dropbox.files.WriteError.conflict(dropbox.files.WriteConflictError.file), upload_session_id="")
+    return dropbox.exceptions.ApiError("request", dropbox.files.UploadError.path(write_failed), "conflict", "en")
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeDropbox:
+    def __init__(self):
+        self.files = {}  # path -> (bytes, rev)
+        self.sessions = {}
+        self.revs = itertools.count(1)
+
+    def files_download(self, path, rev=None):
+        if path not in self.files:
+            raise not_found()
+        content, rev = self.files[path]
+        return SimpleNamespace(rev=rev), FakeResponse(content)
+
+    def files_get_metadata(self, path):
+        if path not in self.files:
+            raise not_found()
+        return SimpleNamespace(rev=self.files[path][1])
+
+    def files_upload(self, content, path, mode=None, strict_conflict=False, **kwargs):
+        current = self.files.get(path)
+        if mode is not None and mode.is_update() and (current is None or current[1] != mode.get_update()):
+            raise conflict()
+        if mode is not None and mode.is_add() and current is not None:
+            raise conflict()
+        rev = f"{next(self.revs):09d}"
+        self.files[path] = (content, rev)
+        return SimpleNamespace(rev=rev)
+
+    def files_upload_session_start(self, content, **kwargs):
+        session_id = f"session-{next(self.revs)}"
+        self.sessions[session_id] = [content]
+        return SimpleNamespace(session_id=session_id)
+
+    def files_upload_session_append_v2(self, content, cursor, **kwargs):
+        self.sessions[cursor.session_id].append(content)
+
+    def files_upload_session_finish(self, content, cursor, commit, **kwargs):
+        data = b"".join(self.sessions.pop(cursor.session_id)) + content
+        return self.files_upload(data, commit.path, mode=commit.mode, strict_conflict=commit.strict_conflict)
+
+    def files_list_folder(self, path, **kwargs):
+        prefix = path.lower().rstrip("/") + "/"
+        entries = [
+            dropbox.files.FileMetadata(name=name.rsplit("/", 1)[1], path_lower=name.lower(), rev=rev)
+            for name, (_, rev) in self.files.items()
+            if name.lower().startswith(prefix)
+        ]
+        if not entries:
+            raise not_found()
+        return SimpleNamespace(entries=entries, has_more=False, cursor=None)
@@ -0,0 +1,208 @@
+# --- Storage contract: every backend loads, queries due, creates, updates, completes, deletes and exports alike ---
+import csv
+import io
+
+import pytest
+
+from fake_dropbox import FakeDropbox
+from tracker import dropbox_log
+from tracker.backends import DropboxBackend, SqliteBackend
+from tracker.events import (
+    DESCRIPTION_PATCHED,
+    SUBTASK_COMPLETED,
+    TASK_COMPLETED,
+    TASK_DELETED,
+    TASK_SAVED,
+    apply_event,
+    description_patch,
+)
+from tracker.model import Status, Task, extract_subtasks
+
+DESCRIPTION = "0101: thaw cells\nnotes: keep on ice\n0301: passage\n1231: freeze stock"
+
+
+def open_backend(kind, directory, name="replica.db", dropbox=None):
+    if kind == "sqlite":
+        return SqliteBackend(str(directory / name))
+    backend = DropboxBackend(str(directory / name), lambda: dropbox)
+    backend.sync.interval = 3600  # the tests sync explicitly
+    return backend
+
+
+@pytest.fixture(params=["sqlite", "dropbox"])
+def kind(request):
+    return request.param
+
+
+@pytest.fixture
+def dropbox():
+    return FakeDropbox()
+
+
+@pytest.fixture
+def backend(kind, tmp_path, dropbox):
+    backend = open_backend(kind, tmp_path, dropbox=dropbox)
+    yield backend
+    backend.close()
+
+
+def new_task(project="P", name="T", description=DESCRIPTION):
+    return Task(project, name, description, Status.NOT_STARTED, extract_subtasks(description))
+
+
+def mutate(backend, task, event, data=None):
+    apply_event(task, event, data)
+    return backend.save_tasks([(task, event, data)])
+
+
+def export_rows(backend):
+    return list(csv.reader(io.StringIO(backend.export_csv().decode())))
+
+
+def test_create_and_load(backend):
+    assert backend.load_tasks() == []
+    task = new_task()
+    backend.save_task(task)
+    assert task.id is not None
+    assert backend.load_tasks() == [task]
+    assert backend.find_tasks([("P", "T")]) == [task]
+    assert backend.find_tasks([("P", "missing")]) == []
+
+
+def test_due_subtasks(backend):
+    task = new_task()
+    backend.save_task(task)
+    assert backend.due_subtasks(101) == [(task.id, 0)]
+    assert backend.due_subtasks(301) == [(task.id, 0), (task.id, 1)]
+    mutate(backend, task, SUBTASK_COMPLETED, 0)
+    assert backend.due_subtasks(301) == [(task.id, 1)]
+
+
+def test_update_keeps_subtask_status(backend):
+    task = new_task()
+    backend.save_task(task)
+    mutate(backend, task, SUBTASK_COMPLETED, 0)
+    edited = DESCRIPTION.replace("0301: passage", "0201: split 1:3")
+    mutate(backend, task, DESCRIPTION_PATCHED, description_patch(task.description, edited))
+    (stored,) = backend.find_tasks([("P", "T")])
+    assert stored.description == edited
+    assert [(sub.title, sub.status) for sub in stored.subtasks] == [
+        ("thaw cells", Status.COMPLETED), ("split 1:3", Status.NOT_STARTED), ("freeze stock", Status.NOT_STARTED)]
+
+
+def test_stale_edit_is_rebased(backend):
+    # A tab loaded before another edit saves its text; the patch is re-made against the stored one
+    task = new_task()
+    backend.save_task(task)
+    (stale,) = backend.find_tasks([("P", "T")])
+    mutate(backend, task, SUBTASK_COMPLETED, 0)
+    mutate(backend, task, DESCRIPTION_PATCHED, description_patch(task.description, DESCRIPTION + "\nnotes: 37 °C"))
+    edited = DESCRIPTION.replace("0301: passage", "0302: passage")
+    assert mutate(backend, stale, DESCRIPTION_PATCHED, description_patch(stale.description, edited)) is not None
+    (stored,) = backend.find_tasks([("P", "T")])
+    assert stored.description == edited
+    assert [(sub.date, sub.status) for sub in stored.subtasks] == [
+        (101, Status.COMPLETED), (302, Status.NOT_STARTED), (1231, Status.NOT_STARTED)]
+
+
+def test_complete_task(backend):
+    task = new_task()
+    backend.save_task(task)
+    mutate(backend, task, TASK_COMPLETED)
+    (stored,) = backend.find_tasks([("P", "T")])
+    assert stored.status == Status.COMPLETED
+    assert all(sub.status == Status.NOT_STARTED for sub in stored.subtasks)
+
+
+def test_delete(backend):
+    task = new_task()
+    backend.save_task(task)
+    mutate(backend, task, TASK_DELETED)
+    assert backend.due_subtasks(1231) == []
+    assert export_rows(backend) == [["Project", "Task", "Description", "Status", "Subtasks"]]
+    # Deletes are a status, so the history (and other replicas) keep the task
+    assert [row["event"] for row in backend.replica.task_history("P", "T")] == ["task_saved", "task_deleted"]
+
+
+def test_no_op_writes_are_skipped(backend):
+    task = new_task()
+    backend.save_task(task)
+    assert mutate(backend, task, SUBTASK_COMPLETED, 0) is not None
+    assert mutate(backend, task, SUBTASK_COMPLETED, 0) is None
+    assert backend.save_tasks([(task, TASK_DELETED, None)], key="delete:1") is not None
+    assert backend.save_tasks([(task, TASK_DELETED, None)], key="delete:1") is None
+    assert backend.write_stats["skipped"] == 1 and backend.write_stats["replays"] == 1
+
+
+def test_export(backend):
+    backend.save_tasks([(new_task("B", "second"), TASK_SAVED, None), (new_task("A", "first"), TASK_SAVED, None)])
+    rows = export_rows(backend)
+    assert rows[0] == ["Project", "Task", "Description", "Status", "Subtasks"]
+    assert sorted(row[:2] for row in rows[1:]) == [["A", "first"], ["B", "second"]]
+    assert rows[1][4].splitlines()[0] == "January 01: thaw cells [Not Started]"
+
+
+def test_state_survives_reopening(kind, tmp_path, dropbox):
+    backend = open_backend(kind, tmp_path, dropbox=dropbox)
+    task = new_task()
+    backend.save_task(task)
+    mutate(backend, task, SUBTASK_COMPLETED, 2)
+    backend.close()
+    reopened = open_backend(kind, tmp_path, dropbox=dropbox)
+    try:
+        assert reopened.find_tasks([("P", "T")]) == [task]
+    finally:
+        reopened.close()
+
+
+def test_dropbox_replicas_converge(tmp_path, dropbox):
+    # A second machine starting from an empty replica pulls the same state from the logs
+    first = open_backend("dropbox", tmp_path, "first.db", dropbox)
+    second = open_backend("dropbox", tmp_path, "second.db", dropbox)
+    try:
+        task = new_task()
+        first.save_task(task)
+        mutate(first, task, SUBTASK_COMPLETED, 1)
+        mutate(first, task, TASK_COMPLETED)
+        first.sync.sync_once()
+        assert first.replica.pending_count() == 0
+        second.sync.sync_once()
+        assert second.find_tasks([("P", "T")]) == [task]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_partitioning_race_keeps_pushed_events(tmp_path, dropbox):
+    # Two machines find the shared log unpartitioned. The one that splits it second must not
+    # replace partitions the first has already appended to.
+    legacy = dropbox_log.new_log()
+    dropbox_log.write_rows(legacy, [{
+        "timestamp": "2026-01-01T09:00:00", "project": "P", "task": "T", "description": DESCRIPTION,
+        "status": str(Status.NOT_STARTED), "subtasks": new_task().subtasks_to_dicts(), "event": TASK_SAVED,
+        "data": None}])
+    legacy.seek(0)
+    dropbox.files[dropbox_log.legacy_log_path()] = (legacy.read(), f"{next(dropbox.revs):09d}")
+    first = open_backend("dropbox", tmp_path, "first.db", dropbox)
+    second = open_backend("dropbox", tmp_path, "second.db", dropbox)
+    fresh = None
+    try:
+        first.sync.sync_once()
+        (task,) = first.find_tasks([("P", "T")])
+        mutate(first, task, SUBTASK_COMPLETED, 0)
+        first.sync.sync_once()
+        assert first.replica.pending_count() == 0
+        # The second machine read "no manifest" before the first saved one
+        with second.sync._lock:
+            second.sync._partition_legacy_log(second.sync._client(), dropbox_log.DROPBOX_ROOT, dropbox_log)
+        second.sync.sync_once()
+        assert second.sync.last_error is None
+        fresh = open_backend("dropbox", tmp_path, "fresh.db", dropbox)
+        fresh.sync.sync_once()
+        for backend in (first, second, fresh):
+            (stored,) = backend.find_tasks([("P", "T")])
+            assert stored.subtasks[0].status == Status.COMPLETED
+    finally:
+        for backend in (first, second, fresh):
+            if backend is not None:
+                backend.close()
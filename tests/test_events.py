@@ -0,0 +1,95 @@
+# --- Event replay: the streaming reducer agrees with the full sort, patches replay alike everywhere ---
+from tracker.events import (
+    DESCRIPTION_PATCHED,
+    SUBTASK_COMPLETED,
+    TASK_COMPLETED,
+    TASK_DELETED,
+    TASK_SAVED,
+    apply_event,
+    description_patch,
+    reduce_events,
+    reduce_stream,
+)
+from tracker.model import Status, Task, extract_subtasks
+
+DESCRIPTION = "0101: thaw cells\nnotes: keep on ice\n0301: passage"
+
+
+def row(minute, event, data=None, task="T", description=DESCRIPTION):
+    snapshot = event == TASK_SAVED
+    return {
+        "timestamp": f"2026-01-01T09:{minute:02d}:00",
+        "project": "P",
+        "task": task,
+        "description": description if snapshot else "",
+        "status": str(Status.NOT_STARTED) if snapshot else None,
+        "subtasks": [sub.to_dict() for sub in extract_subtasks(description)] if snapshot else [],
+        "event": event,
+        "data": data,
+    }
+
+
+def streamed(rows):
+    # reduce_stream over rows in arrival order, and whether it had to read them again
+    replays = []
+
+    def replay():
+        replays.append(True)
+        return iter(rows)
+
+    return reduce_stream(iter(rows), replay), bool(replays)
+
+
+def test_in_order_rows_stream_without_a_second_pass():
+    rows = [row(0, TASK_SAVED), row(1, SUBTASK_COMPLETED, "0"), row(2, TASK_COMPLETED)]
+    latest, replayed = streamed(rows)
+    assert latest == reduce_events(rows) and not replayed
+    assert latest[("P", "T")]["status"] == str(Status.COMPLETED)
+
+
+def test_out_of_order_rows_match_the_full_sort():
+    rows = [row(0, TASK_SAVED), row(5, SUBTASK_COMPLETED, "1"), row(3, SUBTASK_COMPLETED, "0"),
+            row(0, TASK_SAVED, task="U"), row(1, SUBTASK_COMPLETED, "0", task="U")]
+    latest, replayed = streamed(rows)
+    assert replayed and latest == reduce_events(rows)
+    assert [sub["status"] for sub in latest[("P", "T")]["subtasks"]] == [str(Status.COMPLETED)] * 2
+    assert latest[("P", "U")]["subtasks"][0]["status"] == str(Status.COMPLETED)
+
+
+def test_late_completion_after_a_delete_stays_deleted():
+    # The completion happened before the delete but reached the log after it
+    rows = [row(0, TASK_SAVED), row(4, TASK_DELETED), row(2, SUBTASK_COMPLETED, "0")]
+    latest, replayed = streamed(rows)
+    assert replayed and latest == reduce_events(rows)
+    assert latest[("P", "T")]["status"] == str(Status.DELETED)
+    assert latest[("P", "T")]["subtasks"][0]["status"] == str(Status.COMPLETED)
+
+
+def test_event_before_its_snapshot_is_replayed():
+    rows = [row(1, SUBTASK_COMPLETED, "0"), row(0, TASK_SAVED)]
+    latest, replayed = streamed(rows)
+    assert replayed and latest == reduce_events(rows)
+    assert latest[("P", "T")]["subtasks"][0]["status"] == str(Status.COMPLETED)
+
+
+def test_patch_against_another_text_is_ignored():
+    task = Task("P", "T", DESCRIPTION, Status.NOT_STARTED, extract_subtasks(DESCRIPTION))
+    stale = description_patch("0101: thaw cells", "0101: thaw cells\n0201: split")
+    apply_event(task, DESCRIPTION_PATCHED, stale)
+    assert task.description == DESCRIPTION
+    assert [sub.title for sub in task.subtasks] == ["thaw cells", "passage"]
+
+
+def test_concurrent_patches_replay_alike_in_any_arrival_order():
+    # Two machines patch the same text; the one sorting second no longer matches and is dropped
+    first = description_patch(DESCRIPTION, DESCRIPTION.replace("passage", "passage 1:3"))
+    second = description_patch(DESCRIPTION, DESCRIPTION.replace("thaw cells", "thaw vial"))
+    rows = [row(0, TASK_SAVED), row(1, SUBTASK_COMPLETED, "0"), row(2, DESCRIPTION_PATCHED, first),
+            row(3, DESCRIPTION_PATCHED, second)]
+    for arrival in (rows, [rows[0], rows[1], rows[3], rows[2]]):
+        latest, _ = streamed(arrival)
+        assert latest == reduce_events(rows)
+    state = reduce_events(rows)[("P", "T")]
+    assert state["description"] == DESCRIPTION.replace("passage", "passage 1:3")
+    assert [(sub["title"], sub["status"]) for sub in state["subtasks"]] == [
+        ("thaw cells", str(Status.COMPLETED)), ("passage 1:3", str(Status.NOT_STARTED))]
@@ -0,0 +1,22 @@
+# --- Calendar feeds: validators move forward with every change the replica takes in ---
+from tracker.events import SUBTASK_COMPLETED
+from tracker.ics import FeedCache
+from tracker.model import Status, Task, extract_subtasks
+from tracker.replica import LocalReplica
+
+DESCRIPTION = "0101: thaw cells\n0301: passage"
+
+
+def test_late_remote_row_never_moves_last_modified_back(tmp_path):
+    replica = LocalReplica(str(tmp_path / "replica.db"), outbox=False)
+    replica.save_task(Task("P", "T", DESCRIPTION, Status.NOT_STARTED, extract_subtasks(DESCRIPTION)))
+    feeds = FeedCache(replica, "lab")
+    etag, last_modified, _ = feeds.feed("P")
+    # Another machine's completion from years ago reaches this replica only now
+    replica.add_history([{
+        "timestamp": "2020-01-01T09:00:00", "project": "P", "task": "T", "description": "", "status": None,
+        "subtasks": [], "event": SUBTASK_COMPLETED, "data": "0",
+    }])
+    new_etag, new_last_modified, _ = feeds.feed("P")
+    assert new_etag != etag and new_last_modified >= last_modified
+    replica.close()
@@ -0,0 +1,34 @@
+# --- Model helpers: subtask status carried across description edits ---
+from tracker.model import Status, Subtask, extract_subtasks, merge_subtasks
+
+
+def merged(old_lines, done, new_text):
+    # done: titles completed before the edit; returns (title, completed?) after it
+    old = [Subtask(int(line[:4]), line[6:], Status.COMPLETED if line[6:] in done else Status.NOT_STARTED)
+           for line in old_lines]
+    return [(sub.title, sub.status == Status.COMPLETED) for sub in merge_subtasks(old, extract_subtasks(new_text))]
+
+
+def test_unchanged_and_moved_lines_keep_status():
+    assert merged(["0101: thaw", "0201: split"], {"thaw", "split"}, "0105: thaw\n0201: split") == [
+        ("thaw", True), ("split", True)]
+
+
+def test_retitled_line_keeps_status():
+    assert merged(["0101: step 1", "0201: split"], {"step 1"}, "0101: step 1 (thaw)\n0201: split") == [
+        ("step 1 (thaw)", True), ("split", False)]
+
+
+def test_replaced_step_on_the_same_date_starts_over():
+    assert merged(["0101: A"], {"A"}, "0101: C (new step)") == [("C (new step)", False)]
+
+
+def test_added_step_on_a_date_does_not_inherit():
+    # One step deleted and two added on 0101: a similar title alone is not a retitle
+    assert merged(["0101: wash 1", "0201: split"], {"wash 1"}, "0101: wash 2\n0101: wash 3\n0201: split") == [
+        ("wash 2", False), ("wash 3", False), ("split", False)]
+
+
+def test_duplicate_titles_are_matched_in_order():
+    assert merged(["0101: wash", "0102: wash"], {"wash"}, "0101: wash\n0103: wash") == [
+        ("wash", True), ("wash", True)]
@@ -0,0 +1,37 @@
+# --- Templates page: starting a protocol never replaces a task that already has its name ---
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from tracker.backends import SqliteBackend
+from tracker.events import TASK_SAVED
+from tracker.model import Status, Task, extract_subtasks
+
+APP = str(Path(__file__).resolve().parents[1] / "app.py")
+
+
+def test_start_skips_projects_with_a_task_of_that_name(tmp_path):
+    path = str(tmp_path / "replica.db")
+    backend = SqliteBackend(path)
+    running = Task("A", "Passaging", "0101: thaw cells", Status.IN_PROGRESS, extract_subtasks("0101: thaw cells"))
+    running.subtasks[0].status = Status.COMPLETED
+    backend.save_tasks([(running, TASK_SAVED, None)])
+    backend.replica.save_template("Passaging", "D0: thaw cells\nD2: passage")
+    backend.close()
+
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.secrets["storage"] = {"backend": "sqlite", "path": path}
+    at.query_params["page"] = "8"
+    at.run()
+    at.multiselect[0].set_value(["A"])
+    at.text_input[1].set_value("B")  # new projects
+    at.run()
+    assert "already exists in A" in at.warning[0].value
+    assert at.button(key="template-start").label == "🚀 Start in 1 project(s)"
+    at.button(key="template-start").click()
+    at.run()
+    assert not at.exception
+
+    tasks = {task.project: task for task in SqliteBackend(path).load_tasks()}
+    assert tasks["A"].description == "0101: thaw cells" and tasks["A"].subtasks[0].status == Status.COMPLETED
+    assert [sub.title for sub in tasks["B"].subtasks] == ["thaw cells", "passage"]
@@ -0,0 +1,65 @@
+# --- Lab pool: labs in use stay open, idle ones are closed past capacity ---
+from tracker.tenants import TenantPool
+
+
+class FakeBackend:
+    def __init__(self, lab):
+        self.lab = lab
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_pool(capacity=2, idle_seconds=60):
+    clock = Clock()
+    opened = []
+
+    def open_backend(lab):
+        opened.append(FakeBackend(lab))
+        return opened[-1]
+
+    return TenantPool(open_backend, capacity, idle_seconds, clock), clock, opened
+
+
+def test_labs_in_use_are_not_closed_past_capacity():
+    pool, clock, opened = open_pool()
+    # Three labs with open pages, each polling every few seconds
+    for _ in range(20):
+        clock.now += 5
+        for lab in ("a", "b", "c"):
+            pool.get(lab)
+    assert len(opened) == 3 and not any(backend.closed for backend in opened)
+    assert len(pool) == 3
+
+
+def test_idle_labs_are_closed_least_recent_first():
+    pool, clock, opened = open_pool()
+    a, b = pool.get("a"), pool.get("b")
+    clock.now += 30
+    pool.get("a")
+    clock.now += 45  # b idle for 75 s, a for 45 s
+    c = pool.get("c")
+    assert b.closed and not a.closed and not c.closed
+    assert len(pool) == 2
+    assert pool.get("b") is not b  # reopened on its next use
+
+
+def test_feed_lookups_do_not_count_as_use():
+    pool, clock, opened = open_pool()
+    a = pool.get("a")
+    pool.get("b")
+    for _ in range(20):
+        clock.now += 5
+        assert pool.get("a", touch=False) is a
+        pool.get("b")
+    pool.get("c")
+    assert a.closed and len(pool) == 2
@@ -0,0 +1,158 @@
+# --- RateLimitedClient against a fake Dropbox that throttles: backoff, Retry-After, token bucket ---
+import dropbox
+import pytest
+
+import tracker.throttle as throttle
+from fake_dropbox import FakeDropbox
+from tracker.backends import DropboxBackend
+from tracker.events import TASK_SAVED
+from tracker.model import Status, Task, extract_subtasks
+from tracker.throttle import MAX_RETRIES, RateLimitedClient, TokenBucket
+
+
+class FakeClock:
+    # Stands in for the time module inside tracker.throttle, so waits are recorded, not slept
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # Real sleeps always let some time pass; a float-sized nap must too
+        self.sleeps.append(seconds)
+        self.now += max(seconds, 1e-6)
+
+
+def rate_limited(retry_after=None):
+    return dropbox.exceptions.RateLimitError("request", None, retry_after)
+
+
+def too_many_writes():
+    write_failed = dropbox.files.UploadWriteFailed(
+        reason=dropbox.files.WriteError.too_many_write_operations, upload_session_id="session")
+    return dropbox.exceptions.ApiError("request", dropbox.files.UploadError.path(write_failed), "throttled", "en")
+
+
+class ThrottlingDropbox(FakeDropbox):
+    # Fails the next calls with the queued errors, or every `every`-th call with a 429
+    def __init__(self, every=None, retry_after=None):
+        super().__init__()
+        self.failures = []
+        self.every = every
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def maybe_fail(self):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        if self.every and self.calls % self.every == 0:
+            raise rate_limited(self.retry_after)
+
+    def files_download(self, path, rev=None):
+        self.maybe_fail()
+        return super().files_download(path, rev)
+
+    def files_get_metadata(self, path):
+        self.maybe_fail()
+        return super().files_get_metadata(path)
+
+    def files_upload(self, content, path, mode=None, strict_conflict=False, **kwargs):
+        self.maybe_fail()
+        return super().files_upload(content, path, mode, strict_conflict, **kwargs)
+
+    def files_list_folder(self, path, **kwargs):
+        self.maybe_fail()
+        return super().files_list_folder(path, **kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def server():
+    server = ThrottlingDropbox()
+    server.files["/log.csv"] = (b"Timestamp\n", "000000001")
+    return server
+
+
+def test_retry_after_is_honoured(clock, server):
+    client = RateLimitedClient(server, TokenBucket())
+    server.failures = [rate_limited(retry_after=3)]
+    metadata, response = client.files_download("/log.csv")
+    assert response.content == b"Timestamp\n"
+    assert server.calls == 2
+    assert 3 <= clock.sleeps[0] <= 3 + throttle.BACKOFF_BASE_SECONDS
+
+
+def test_write_contention_backs_off_with_jitter(clock, server):
+    client = RateLimitedClient(server, TokenBucket())
+    server.failures = [too_many_writes(), too_many_writes()]
+    client.files_upload(b"row\n", "/log.csv", mode=dropbox.files.WriteMode.overwrite)
+    assert server.files["/log.csv"][0] == b"row\n"
+    assert server.calls == 3
+    # Full jitter: attempt n backs off somewhere in [0, base * 2**n], and the bucket pause
+    # it leaves behind is refilled while the client sleeps
+    assert clock.sleeps[0] <= throttle.BACKOFF_BASE_SECONDS
+    assert clock.now <= throttle.BACKOFF_BASE_SECONDS * (1 + 2) + 1
+
+
+def test_other_errors_are_not_retried(clock, server):
+    client = RateLimitedClient(server, TokenBucket())
+    with pytest.raises(dropbox.exceptions.ApiError):
+        client.files_get_metadata("/missing.csv")
+    assert server.calls == 1 and clock.sleeps == []
+
+
+def test_gives_up_after_max_retries(clock, server):
+    client = RateLimitedClient(server, TokenBucket())
+    server.failures = [rate_limited() for _ in range(MAX_RETRIES + 1)]
+    with pytest.raises(dropbox.exceptions.RateLimitError):
+        client.files_download("/log.csv")
+    assert server.calls == MAX_RETRIES + 1
+
+
+def test_throttling_pauses_every_caller(clock, server):
+    # A 429 empties the shared bucket, so the next request from any client waits it out too
+    bucket = TokenBucket(rate=5, burst=10)
+    first, second = RateLimitedClient(server, bucket), RateLimitedClient(server, bucket)
+    server.failures = [rate_limited(retry_after=2)]
+    first.files_get_metadata("/log.csv")
+    waited = clock.now
+    second.files_get_metadata("/log.csv")
+    assert waited >= 2 and clock.now > waited
+
+
+def test_bucket_limits_the_request_rate(clock, server):
+    client = RateLimitedClient(server, TokenBucket(rate=5, burst=10))
+    for _ in range(30):
+        client.files_get_metadata("/log.csv")
+    # The burst goes out at once, the other 20 requests at 5 per second
+    assert clock.now == pytest.approx(4, abs=0.01)
+
+
+def test_sync_survives_a_throttling_server(clock, tmp_path):
+    server = ThrottlingDropbox(every=3, retry_after=1)
+    first = DropboxBackend(str(tmp_path / "first.db"), lambda: RateLimitedClient(server, TokenBucket()))
+    second = DropboxBackend(str(tmp_path / "second.db"), lambda: RateLimitedClient(server, TokenBucket()))
+    try:
+        for backend in (first, second):
+            backend.sync.interval = 3600
+        tasks = [Task("P", f"T{index}", "0101: a\n0201: b", Status.NOT_STARTED, extract_subtasks("0101: a\n0201: b"))
+                 for index in range(5)]
+        first.save_tasks([(task, TASK_SAVED, None) for task in tasks])
+        first.sync.sync_once()
+        second.sync.sync_once()
+        assert first.sync.last_error is None and second.sync.last_error is None
+        assert first.replica.pending_count() == 0
+        assert sorted(task.task for task in second.load_tasks()) == [task.task for task in tasks]
+        assert clock.sleeps  # the 429s were waited out, not surfaced
+    finally:
+        first.close()
+        second.close()
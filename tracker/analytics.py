@@ -0,0 +1,119 @@
+# --- Dashboard analytics: vectorized over columnar extracts, refreshed incrementally ---
+import threading
+
+import numpy as np
+import pandas as pd
+
+from tracker.events import SUBTASK_COMPLETED
+from tracker.model import Status
+
+OVERDUE_BINS = [1, 3, 7, 14, 30, np.inf]
+OVERDUE_LABELS = ["1-2 days", "3-6 days", "7-13 days", "14-29 days", "30+ days"]
+DAILY_WINDOW_DAYS = 30
+WEEKLY_WINDOW_WEEKS = 52
+
+
+def due_dates(codes, year):
+    # MMDD integers -> datetimes in the given year; impossible dates (e.g. 0230) become NaT
+    codes = np.asarray(codes, dtype=np.int64)
+    return pd.to_datetime(
+        pd.DataFrame({"year": year, "month": codes // 100, "day": codes % 100}), errors="coerce"
+    )
+
+
+def throughput(completions, freq, since):
+    # Completed subtasks per period (rows) and project (columns)
+    recent = completions[completions["completed_at"] >= since]
+    periods = recent["completed_at"].dt.to_period(freq).dt.start_time.rename("period")
+    return recent.groupby([periods, recent["project"]]).size().unstack(fill_value=0)
+
+
+def overdue_ages(due_codes, today):
+    ages = (pd.Timestamp(today) - due_dates(due_codes, today.year)).dt.days.to_numpy()
+    counts, _ = np.histogram(ages[ages > 0], bins=OVERDUE_BINS)
+    return pd.Series(counts, index=OVERDUE_LABELS, name="subtasks")
+
+
+def lead_times(completions):
+    # Days from a task's creation to each of its subtask completions, averaged per project
+    days = (completions["completed_at"] - completions["created_at"]).dt.total_seconds() / 86400
+    return days.groupby(completions["project"]).mean().rename("days")
+
+
+def summarize(completions, due_codes, today):
+    today = pd.Timestamp(today)
+    lead = lead_times(completions)
+    return {
+        "daily": throughput(completions, "D", today - pd.Timedelta(days=DAILY_WINDOW_DAYS - 1)),
+        "weekly": throughput(completions, "W", today - pd.Timedelta(weeks=WEEKLY_WINDOW_WEEKS)),
+        "overdue": overdue_ages(due_codes, today),
+        "lead_time": lead,
+        "avg_lead_time": lead.mean() if len(lead) else None,
+    }
+
+
+# One per process. Every mutation (local, pulled or archive move) adds a history row, so new
+# rows since the last refresh tell us exactly which tasks to re-extract; otherwise the cached results stand.
+class DashboardAnalytics:
+    def __init__(self, replica):
+        self.replica = replica
+        self._cursor = 0
+        self._completions = pd.DataFrame({
+            "project": pd.Series(dtype=object),
+            "task": pd.Series(dtype=object),
+            "completed_at": pd.Series(dtype="datetime64[us]"),
+        })
+        self._created = {}  # (project, task) -> first time seen in the history
+        self._open_due = {}  # (project, task) -> due codes of its open subtasks
+        self._results = None
+        self._today = None
+        self._lock = threading.Lock()
+
+    def _extract_open(self, keys, tasks):
+        found = {task.key: task for task in tasks}
+        for key in keys:
+            task = found.get(key)
+            if task is None or task.status == Status.DELETED:
+                self._open_due.pop(key, None)  # archived or deleted
+            else:
+                self._open_due[key] = [sub.date for sub in task.subtasks if sub.status != Status.COMPLETED]
+
+    def refresh(self, today):
+        with self._lock:
+            rows = self.replica.history_since(self._cursor)
+            if self._results is None:
+                # First refresh reads every hot task; afterwards only tasks named by new history rows
+                tasks = self.replica.load_tasks()
+                self._extract_open([task.key for task in tasks], tasks)
+            elif rows or today != self._today:
+                keys = {(project, task) for _, project, task, _, _ in rows}
+                self._extract_open(keys, self.replica.find_tasks(keys))
+            else:
+                return self._results
+            completed = []
+            for row_id, project, task, timestamp, event in rows:
+                key = (project, task)
+                if key not in self._created or timestamp < self._created[key]:
+                    self._created[key] = timestamp
+                if event == SUBTASK_COMPLETED:
+                    completed.append((project, task, timestamp))
+            if completed:
+                # Only the new completions are parsed; earlier ones stay in the columnar extract
+                new = pd.DataFrame(completed, columns=["project", "task", "completed_at"])
+                new["completed_at"] = pd.to_datetime(new["completed_at"], format="ISO8601").astype("datetime64[us]")
+                self._completions = pd.concat([self._completions, new], ignore_index=True)
+            if rows:
+                self._cursor = rows[-1][0]
+            self._today = today
+
+            created = pd.DataFrame(
+                [(project, task, timestamp) for (project, task), timestamp in self._created.items()],
+                columns=["project", "task", "created_at"],
+            )
+            created["created_at"] = pd.to_datetime(created["created_at"], format="ISO8601").astype("datetime64[us]")
+            completions = self._completions.merge(created, on=["project", "task"], how="left")
+            due_codes = np.fromiter(
+                (code for codes in self._open_due.values() for code in codes), dtype=np.int64
+            )
+            self._results = summarize(completions, due_codes, today)
+            return self._results
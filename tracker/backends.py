@@ -0,0 +1,195 @@
+# --- Storage backends: one interface shared by every app variant, picked by config ---
+# Each backend offers load_tasks / find_tasks, due_subtasks (the "what's due" query),
+# save_task / save_tasks (create; update, complete and delete are events, see tracker.store)
+# and export_csv, plus .replica for the change feed, history and archive.
+import csv
+import io
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime
+
+from tracker.events import (
+    DESCRIPTION_PATCHED,
+    SUBTASK_COMPLETED,
+    TASK_SAVED,
+    apply_event,
+    description_patch,
+    reduce_events,
+    task_state,
+)
+from tracker.model import Status
+from tracker.replica import LOCAL_DB_PATH, LocalReplica
+from tracker.sync import SyncEngine
+
+EXPORT_COLUMNS = ["Project", "Task", "Description", "Status", "Subtasks"]
+# Idempotency keys of recent actions, remembered so a replayed click is dropped
+RECENT_ACTION_KEYS = 1000
+
+
+class SqliteBackend:
+    # Local-only storage: one SQLite file on this machine, nothing is synced
+    name = "sqlite"
+    sync = None
+
+    def __init__(self, path=LOCAL_DB_PATH, legacy_path=None):
+        self.replica = LocalReplica(path, outbox=False)
+        self.init_writes()
+        if legacy_path:
+            import_legacy_tasks(self.replica, legacy_path)
+
+    def init_writes(self):
+        # Per-tenant derived state (e.g. dashboard analytics), dropped with the backend
+        self.cache = {}
+        self.action_keys = OrderedDict()
+        # Write volume: events stored, no-op events skipped (and the log bytes they would have
+        # taken), replayed actions dropped by key
+        self.write_stats = {"events": 0, "skipped": 0, "skipped_bytes": 0, "replays": 0}
+
+    def close(self):
+        # Cached state may hold work of its own (e.g. queued report jobs)
+        for value in self.cache.values():
+            if hasattr(value, "close"):
+                value.close()
+        self.replica.close()
+
+    def load_tasks(self):
+        return self.replica.load_tasks()
+
+    def find_tasks(self, keys):
+        return self.replica.find_tasks(keys)
+
+    def due_subtasks(self, today):
+        return self.replica.due_subtasks(today)
+
+    def save_task(self, task, event=TASK_SAVED, data=None):
+        return self.save_tasks([(task, event, data)])
+
+    def save_tasks(self, changes, key=None):
+        # One transaction for any number of (task, event, data) changes, already applied to the
+        # caller's tasks. Each event is replayed on the stored task and only those that change it
+        # are written, so repeated clicks and unchanged saves cost no write at all. The stored
+        # task is what gets written, so a session holding a stale copy can't undo newer changes.
+        # Actions with a key already seen are dropped outright. Returns the last timestamp, or
+        # None when nothing was written.
+        if key is not None:
+            if key in self.action_keys:
+                self.write_stats["replays"] += 1
+                self.write_stats["skipped_bytes"] += sum(log_row_size(*change) for change in changes)
+                return None
+            self.action_keys[key] = True
+            while len(self.action_keys) > RECENT_ACTION_KEYS:
+                self.action_keys.popitem(last=False)
+        stored = {task.key: task for task in self.replica.find_tasks(
+            {task.key for task, event, _ in changes if task.id is not None and event != TASK_SAVED})}
+        effective = []
+        for task, event, data in changes:
+            current = stored.get(task.key)
+            if current is None:
+                effective.append((task, event, data))  # new task, snapshot, or not stored (archived)
+                continue
+            before = task_state(current)
+            if event == DESCRIPTION_PATCHED:
+                # The caller's text, as a patch of the stored one (which a stale tab may not have)
+                data = description_patch(current.description, task.description)
+            if not (event == DESCRIPTION_PATCHED and data is None):
+                apply_event(current, event, data)
+            if task_state(current) != before:
+                effective.append((current, event, data))
+            else:
+                self.write_stats["skipped"] += 1
+                self.write_stats["skipped_bytes"] += log_row_size(task, event, data)
+        if not effective:
+            return None
+        self.write_stats["events"] += len(effective)
+        return self.replica.save_tasks(effective)
+
+    def export_csv(self):
+        # All live tasks as CSV bytes, subtasks flattened to "March 14: title [status]" lines
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        writer.writerows(
+            [task.project, task.task, task.description, str(task.status),
+             "\n".join(f"{sub.date_str}: {sub.title} [{sub.status}]" for sub in task.subtasks)]
+            for task in self.load_tasks()
+            if task.status != Status.DELETED
+        )
+        return buffer.getvalue().encode()
+
+
+class DropboxBackend(SqliteBackend):
+    # The same local replica, with a background engine syncing it to the Dropbox CSV logs
+    name = "dropbox"
+
+    def __init__(self, path=LOCAL_DB_PATH, client_factory=None, compression=None, root=None):
+        self.replica = LocalReplica(path)
+        self.init_writes()
+        self.sync = SyncEngine(self.replica, client_factory, root=root, compression=compression).start()
+
+    def close(self):
+        # Queued changes are pushed by the engine's last sync; they also stay in the replica
+        self.sync.stop()
+        super().close()
+
+    def save_tasks(self, changes, key=None):
+        # ...and one sync, which appends all of them to each partition in a single upload
+        timestamp = super().save_tasks(changes, key)
+        if timestamp is not None:
+            self.sync.notify()
+        return timestamp
+
+
+def log_row_size(task, event, data):
+    # Bytes an event row takes in the CSV log (timestamp, key, event, data), for the write stats
+    return len(f"{datetime.now().isoformat()},{task.project},{task.task},,,,{event},{'' if data is None else data}\r\n".encode())
+
+
+# --- One-time import from the standalone apps' tasks.db ---
+def import_legacy_tasks(replica, legacy_path):
+    # Copies rows of the old (id, project, task, description, status, subtasks[, created_at])
+    # table into the replica; subtask completion times become history events for the dashboard.
+    # Tasks sharing a (project, task) name collapse into the newest. Returns the rows imported.
+    if replica.get_state("legacy_import") is not None or not os.path.exists(legacy_path):
+        return 0
+    conn = sqlite3.connect(legacy_path)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(tasks)")]
+    records = []
+    if columns:
+        created_at = "created_at" if "created_at" in columns else "NULL"
+        records = conn.execute(
+            f"SELECT project, task, description, status, subtasks, {created_at} FROM tasks ORDER BY id"
+        ).fetchall()
+    conn.close()
+
+    imported_at = datetime.now().isoformat()
+    rows = []
+    for project, task, description, status, subtasks, created_at in records:
+        if not project or not task:
+            continue
+        subtasks = json.loads(subtasks) if subtasks else []
+        rows.append({
+            "timestamp": created_at or imported_at,
+            "project": project,
+            "task": task,
+            "description": description or "",
+            "status": status or str(Status.NOT_STARTED),
+            "subtasks": subtasks,
+            "event": TASK_SAVED,
+            "data": None,
+        })
+        rows.extend({
+            "timestamp": sub["completed_at"],
+            "project": project,
+            "task": task,
+            "description": "",
+            "status": None,
+            "subtasks": None,
+            "event": SUBTASK_COMPLETED,
+            "data": str(ordinal),
+        } for ordinal, sub in enumerate(subtasks) if sub.get("completed_at"))
+    replica.merge_remote(reduce_events(rows))
+    replica.add_history(rows)
+    replica.set_state("legacy_import", legacy_path)
+    return len(records)
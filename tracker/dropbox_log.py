@@ -0,0 +1,295 @@
+# --- Dropbox protocol log: per-project partitions, streamed download, merge and conditional append ---
+import csv
+import gzip
+import hashlib
+import io
+import json
+import re
+import shutil
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import dropbox
+
+from tracker.events import TASK_SAVED
+
+DROPBOX_ROOT = "/protocol_tracker"
+# Snapshots fill Description/Status/Subtasks; other events only carry Event and Data
+LOG_COLUMNS = ["Timestamp", "Project", "Task", "Description", "Status", "Subtasks", "Event", "Data"]
+DOWNLOAD_WORKERS = 8
+# Logs move in chunks of this size; larger files are uploaded through an upload session
+CHUNK_SIZE = 4 * 1024 * 1024
+UPLOAD_SESSION_THRESHOLD = 4 * CHUNK_SIZE
+# Optional log compression ("gzip" or "zstd"); downloads are detected by magic bytes,
+# so plain, gzip and zstd logs stay readable side by side. zstd needs the zstandard package.
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# csv refuses fields over 128 KiB by default; a long protocol description or subtask list
+# must not make a partition unreadable (2**31 - 1 is the largest limit every platform's C long takes)
+csv.field_size_limit(2**31 - 1)
+
+
+# --- Partition layout: <root>/projects/<slug>-<hash>.csv plus <root>/manifest.json ---
+def partition_dir(root=DROPBOX_ROOT):
+    return f"{root}/projects"
+
+
+def manifest_path(root=DROPBOX_ROOT):
+    return f"{root}/manifest.json"
+
+
+def legacy_log_path(root=DROPBOX_ROOT):
+    # Single shared log used before partitioning; split into partitions once, then left as a backup
+    return f"{root}/protocol_log.csv"
+
+
+def partition_path(project, root=DROPBOX_ROOT):
+    # Deterministic, so two clients creating the same project pick the same file
+    slug = re.sub(r"[^a-z0-9]+", "-", project.lower()).strip("-")[:40] or "project"
+    digest = hashlib.sha1(project.encode()).hexdigest()[:8]
+    return f"{partition_dir(root)}/{slug}-{digest}.csv".lower()
+
+
+# --- Streaming log files: spooled to temp files, parsed and written one row at a time ---
+def new_log():
+    # An empty log spool with just the header
+    spool = tempfile.TemporaryFile()
+    write_rows(spool, [], header=True)
+    return spool
+
+
+def write_rows(spool, rows, header=False):
+    spool.seek(0, io.SEEK_END)
+    text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+    writer = csv.writer(text, lineterminator="\n")
+    if header:
+        writer.writerow(LOG_COLUMNS)
+    writer.writerows([
+        row["timestamp"],
+        row["project"],
+        row["task"],
+        row["description"] or "",
+        row["status"] or "",
+        json.dumps(row["subtasks"]) if row["subtasks"] is not None else "",
+        row["event"],
+        row["data"] or "",
+    ] for row in rows)
+    text.flush()
+    text.detach()
+
+
+def iter_log_rows(spool):
+    # Parses a spooled log lazily into event row dicts (the same shape as queued outbox rows).
+    # Logs written before events existed have no Event/Data columns: every row is a snapshot.
+    spool.seek(0)
+    text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+    try:
+        reader = csv.reader(text)
+        columns = next(reader, None) or []
+        for record in reader:
+            values = dict(zip(columns, record))
+            subtasks = values.get("Subtasks")
+            yield {
+                "timestamp": values["Timestamp"],
+                "project": values["Project"],
+                "task": values["Task"],
+                "description": values.get("Description") or "",
+                "status": values.get("Status") or None,
+                "subtasks": json.loads(subtasks) if subtasks else [],
+                "event": values.get("Event") or TASK_SAVED,
+                "data": values.get("Data") or None,
+            }
+    finally:
+        text.detach()
+
+
+def log_header(spool):
+    spool.seek(0)
+    return next(csv.reader([spool.readline().decode()]), None)
+
+
+def append_rows(spool, rows):
+    # Returns the spool to upload: spool (None for a new log) with rows added at the end.
+    # A log with an older header is rewritten once in the current format.
+    if spool is None:
+        spool = new_log()
+    elif log_header(spool) != LOG_COLUMNS:
+        upgraded = new_log()
+        write_rows(upgraded, iter_log_rows(spool))
+        spool.close()
+        spool = upgraded
+    write_rows(spool, rows)
+    return spool
+
+
+# --- Compression: spools are always plain CSV; only the stored copy is compressed ---
+def decompressor(head):
+    # Picks a streaming decompressor from the first bytes of a file; None for plain CSV
+    if head.startswith(GZIP_MAGIC):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if head.startswith(ZSTD_MAGIC):
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj()
+    return None
+
+
+def compress_log(spool, compression):
+    # Returns a new temp file holding the compressed spool; the caller closes it
+    packed = tempfile.TemporaryFile()
+    spool.seek(0)
+    if compression == "gzip":
+        with gzip.GzipFile(fileobj=packed, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as writer:
+            shutil.copyfileobj(spool, writer, CHUNK_SIZE)
+    elif compression == "zstd":
+        import zstandard
+
+        with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(packed, closefd=False) as writer:
+            shutil.copyfileobj(spool, writer, CHUNK_SIZE)
+    else:
+        packed.close()
+        raise ValueError(f"Unknown log compression: {compression}")
+    return packed
+
+
+def download_log(dbx, path, spool):
+    # Streams the log into spool chunk by chunk, decompressing if needed;
+    # returns its rev, or None if it doesn't exist
+    try:
+        metadata, res = dbx.files_download(path)
+    except dropbox.exceptions.ApiError:
+        return None
+    head = b""
+    unpack = None
+    with closing(res):
+        for chunk in res.iter_content(CHUNK_SIZE):
+            if unpack is None:
+                # Wait for enough bytes to recognise the format
+                head += chunk
+                if len(head) < len(ZSTD_MAGIC):
+                    continue
+                unpack = decompressor(head) or False
+                chunk = head
+            spool.write(unpack.decompress(chunk) if unpack else chunk)
+    if unpack is None:
+        spool.write(head)  # a file shorter than the magic bytes
+    elif unpack:
+        spool.write(unpack.flush())
+    return metadata.rev
+
+
+def download_partitions(dbx, paths):
+    # Fetch several partitions concurrently into temp files; returns {path: (spool, rev)}.
+    # The caller closes the spools.
+    paths = list(paths)
+    if not paths:
+        return {}
+
+    def fetch(path):
+        spool = tempfile.TemporaryFile()
+        return spool, download_log(dbx, path, spool)
+
+    with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(paths))) as pool:
+        return dict(zip(paths, pool.map(fetch, paths)))
+
+
+def partition_revs(dbx, root=DROPBOX_ROOT):
+    # One listing call tells us which partitions changed since the last sync
+    try:
+        result = dbx.files_list_folder(partition_dir(root))
+    except dropbox.exceptions.ApiError:
+        return {}
+    entries = list(result.entries)
+    while result.has_more:
+        result = dbx.files_list_folder_continue(result.cursor)
+        entries.extend(result.entries)
+    return {
+        entry.path_lower: entry.rev
+        for entry in entries
+        if isinstance(entry, dropbox.files.FileMetadata)
+    }
+
+
+def load_manifest(dbx, root=DROPBOX_ROOT):
+    # Returns (manifest, rev); manifest is None before the log has been partitioned
+    try:
+        metadata, res = dbx.files_download(manifest_path(root))
+    except dropbox.exceptions.ApiError:
+        return None, None
+    with closing(res):
+        return json.loads(res.content.decode()), metadata.rev
+
+
+def save_manifest(dbx, manifest, rev, root=DROPBOX_ROOT):
+    mode = dropbox.files.WriteMode.update(rev) if rev else dropbox.files.WriteMode.add
+    data = json.dumps(manifest, indent=2, sort_keys=True).encode()
+    return dbx.files_upload(data, manifest_path(root), mode=mode, strict_conflict=True).rev
+
+
+def create_manifest(dbx, manifest, root=DROPBOX_ROOT):
+    # Saves the first manifest; returns (manifest, rev) of the one stored. If another client
+    # saved one first, that one is kept, with any of our projects it lacks added.
+    try:
+        return manifest, save_manifest(dbx, manifest, None, root)
+    except dropbox.exceptions.ApiError as e:
+        if not is_write_conflict(e):
+            raise
+    stored, rev = load_manifest(dbx, root)
+    missing = {project: path for project, path in manifest["projects"].items() if project not in stored["projects"]}
+    if missing:
+        stored = {**stored, "projects": {**stored["projects"], **missing}}
+        rev = save_manifest(dbx, stored, rev, root)
+    return stored, rev
+
+
+def is_write_conflict(error):
+    # An add or update refused because the file exists or moved on: another client wrote it
+    if not isinstance(error, dropbox.exceptions.ApiError):
+        return False
+    reason = error.error
+    if not (hasattr(reason, "is_path") and reason.is_path()):
+        return False
+    # UploadError wraps the WriteError in UploadWriteFailed; session finishes don't
+    write_error = reason.get_path()
+    write_error = getattr(write_error, "reason", write_error)
+    return hasattr(write_error, "is_conflict") and write_error.is_conflict()
+
+
+def upload_new_log(dbx, spool, path, compression=None):
+    # Creates the log at path; None (and nothing written) if another client created it first
+    try:
+        return upload_log(dbx, spool, None, path, compression=compression)
+    except dropbox.exceptions.ApiError as e:
+        if is_write_conflict(e):
+            return None
+        raise
+
+
+def upload_log(dbx, spool, rev, path, compression=None):
+    # Only overwrite the revision we read, so a concurrent writer is never clobbered
+    mode = dropbox.files.WriteMode.update(rev) if rev else dropbox.files.WriteMode.add
+    if not compression:
+        return upload_file(dbx, spool, path, mode)
+    with compress_log(spool, compression) as packed:
+        return upload_file(dbx, packed, path, mode)
+
+
+def upload_file(dbx, spool, path, mode):
+    size = spool.seek(0, io.SEEK_END)
+    spool.seek(0)
+    if size <= UPLOAD_SESSION_THRESHOLD:
+        return dbx.files_upload(spool.read(), path, mode=mode, strict_conflict=True).rev
+
+    # Large logs go up in chunks through an upload session, never held in memory whole
+    session = dbx.files_upload_session_start(spool.read(CHUNK_SIZE))
+    cursor = dropbox.files.UploadSessionCursor(session_id=session.session_id, offset=spool.tell())
+    while size - spool.tell() > CHUNK_SIZE:
+        dbx.files_upload_session_append_v2(spool.read(CHUNK_SIZE), cursor)
+        cursor.offset = spool.tell()
+    commit = dropbox.files.CommitInfo(path=path, mode=mode, strict_conflict=True)
+    return dbx.files_upload_session_finish(spool.read(), cursor, commit).rev
@@ -0,0 +1,167 @@
+# --- Mutation events: compact log records and the reducer that folds them into task state ---
+import difflib
+import json
+import zlib
+from datetime import datetime
+
+from tracker.model import TASK_VERSIONS, Status, Task, extract_subtasks, merge_subtasks, reschedule_line
+
+# A full snapshot (Description, Status, Subtasks); log rows written before events existed count as one
+TASK_SAVED = "task_saved"
+# data: ordinal of the subtask in the task's subtask list
+SUBTASK_COMPLETED = "subtask_completed"
+# data: "<ordinal>:<MMDD>"; the subtask's line in the description gets the new date too
+SUBTASK_RESCHEDULED = "subtask_rescheduled"
+# data: the new description; subtasks are re-extracted from it (statuses reset). Only replayed
+# now; edits are written as DESCRIPTION_PATCHED
+DESCRIPTION_EDITED = "description_edited"
+# data: JSON [crc32 of the description before, [[first line, end line, [new lines]], ...]]; the
+# changed lines only. Subtasks are re-extracted and keep the status of the ones they match
+# (see merge_subtasks). A patch made against another text (a concurrent edit that sorted
+# first) is ignored, so every client replays the same description.
+DESCRIPTION_PATCHED = "description_patched"
+# The events that can change a task's description
+DESCRIPTION_EVENTS = (TASK_SAVED, DESCRIPTION_EDITED, DESCRIPTION_PATCHED)
+# The task's own status becomes Completed; its subtasks are left as they are
+TASK_COMPLETED = "task_completed"
+TASK_DELETED = "task_deleted"
+# Local-only history markers for moves between the hot and archive tables; never logged
+TASK_ARCHIVED = "task_archived"
+TASK_RESTORED = "task_restored"
+
+
+def apply_event(task, event, data=None):
+    # Used both for local writes and for replay, so a click and its replay always agree
+    if event == SUBTASK_COMPLETED:
+        ordinal = int(data)
+        if ordinal < len(task.subtasks):
+            task.subtasks[ordinal].status = Status.COMPLETED
+    elif event == SUBTASK_RESCHEDULED:
+        ordinal, date = (int(part) for part in data.split(":"))
+        if ordinal < len(task.subtasks):
+            task.subtasks[ordinal].date = date
+            task.description = reschedule_line(task.description, ordinal, date)
+    elif event == DESCRIPTION_EDITED:
+        task.description = data
+        task.subtasks = extract_subtasks(data)
+    elif event == DESCRIPTION_PATCHED:
+        description = patch_description(task.description, data)
+        if description is not None:
+            task.description = description
+            task.subtasks = merge_subtasks(task.subtasks, extract_subtasks(description))
+    elif event == TASK_COMPLETED:
+        task.status = Status.COMPLETED
+    elif event == TASK_DELETED:
+        task.status = Status.DELETED
+    task.version = next(TASK_VERSIONS)
+    return task
+
+
+def description_patch(before, after):
+    # DESCRIPTION_PATCHED data turning before into after, or None when they are equal
+    old, new = before.split("\n"), after.split("\n")
+    ops = [
+        [i1, i2, new[j1:j2]]
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+        if tag != "equal"
+    ]
+    if not ops:
+        return None
+    return json.dumps([zlib.crc32(before.encode()), ops], ensure_ascii=False, separators=(",", ":"))
+
+
+def patch_description(description, data):
+    # The patched text, or None when the patch was made against a different one
+    base, ops = json.loads(data)
+    if zlib.crc32(description.encode()) != base:
+        return None
+    lines = description.split("\n")
+    for first, end, replacement in reversed(ops):
+        lines[first:end] = replacement
+    return "\n".join(lines)
+
+
+def task_state(task):
+    # Everything an event can change; equal before and after means the event was a no-op
+    return task.description, task.status, [(sub.date, sub.title, sub.status) for sub in task.subtasks]
+
+
+def event_order(row):
+    # Timestamp order; identical timestamps are broken by content so every client replays alike
+    # (queued rows carry None where log rows carry "" / [])
+    content = json.dumps([row["event"], row["data"], row["description"] or "", row["status"], row["subtasks"] or []])
+    return datetime.fromisoformat(row["timestamp"]), content
+
+
+def fold_event(task, row):
+    # One replay step: a snapshot replaces the task, any other event modifies it
+    if row["event"] == TASK_SAVED:
+        return Task.from_record(row["project"], row["task"], row["description"], row["status"], row["subtasks"])
+    if task is not None:
+        apply_event(task, row["event"], row["data"])
+    return task  # None for an event whose snapshot we never saw
+
+
+def reduce_events(rows):
+    # Fold log rows (any order) into the current state per (project, task); returns row dicts
+    tasks = {}
+    timestamps = {}
+    for row in sorted(rows, key=event_order):
+        key = (row["project"], row["task"])
+        task = fold_event(tasks.get(key), row)
+        if task is None:
+            continue
+        tasks[key] = task
+        timestamps[key] = row["timestamp"]
+    return {key: state_row(task, timestamps[key]) for key, task in tasks.items()}
+
+
+def reduce_stream(rows, replay):
+    # Folds rows in arrival order, holding one task per key instead of the log. Logs are
+    # appended roughly in time order; a task that receives an out-of-order row is rebuilt
+    # afterwards from replay(), which must yield the same rows again (only its rows are kept).
+    tasks = {}
+    last = {}
+    late = set()
+    for row in rows:
+        key = (row["project"], row["task"])
+        if key in late:
+            continue
+        # Full event_order only on a timestamp tie; a plain comparison covers the rest
+        previous = last.get(key)
+        if previous is not None and row["timestamp"] <= previous["timestamp"]:
+            if datetime.fromisoformat(row["timestamp"]) < datetime.fromisoformat(previous["timestamp"]) or (
+                    event_order(row) < event_order(previous)):
+                late.add(key)  # older than what we applied
+                continue
+        task = fold_event(tasks.get(key), row)
+        if task is None:
+            late.add(key)  # an event before its snapshot
+            continue
+        tasks[key] = task
+        last[key] = row
+    latest = {key: state_row(task, last[key]["timestamp"]) for key, task in tasks.items() if key not in late}
+    if late:
+        latest.update(reduce_events(row for row in replay() if (row["project"], row["task"]) in late))
+    return latest
+
+
+def state_row(task, timestamp):
+    return {
+        "timestamp": timestamp,
+        "project": task.project,
+        "task": task.task,
+        "description": task.description,
+        "status": str(task.status),
+        "subtasks": task.subtasks_to_dicts(),
+    }
+
+
+def replay_history(rows):
+    # One task's rows in order; yields (row, description before it, task after it)
+    task = None
+    for row in sorted(rows, key=event_order):
+        before = task.description if task is not None else None
+        task = fold_event(task, row)
+        if task is not None:
+            yield row, before, task
@@ -0,0 +1,199 @@
+# --- iCalendar feeds of dated subtasks, served with ETag / Last-Modified ---
+# Off unless [calendar] port (and token) are set in secrets.toml: a small HTTP server thread
+# serves /feed.ics?lab=<lab>&project=<project>&token=<token> (project omitted = the whole lab).
+import hmac
+import threading
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from tracker.model import Status
+
+FEED_PATH = "/feed.ics"
+PRODID = "-//Protocol Tracker//Subtasks//EN"
+
+
+def ics_text(value):
+    # RFC 5545 TEXT escaping
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def fold(line):
+    # Content lines are folded at 75 octets, continuation lines start with a space
+    data = line.encode()
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        while cut and (data[cut] & 0xC0) == 0x80:
+            cut -= 1  # never split a UTF-8 sequence
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+    parts.append(data.decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def due_date(code, year):
+    # MMDD codes carry no year; impossible dates (e.g. 0230) are left out of the feed
+    try:
+        return date(year, code // 100, code % 100)
+    except ValueError:
+        return None
+
+
+def task_events(task, year, stamp, lab):
+    # One all-day VEVENT per dated subtask; the uid is stable, so clients update events in place
+    lines = []
+    if task.status == Status.DELETED:
+        return ""
+    for ordinal, sub in enumerate(task.subtasks):
+        due = due_date(sub.date, year)
+        if due is None:
+            continue
+        done = sub.status == Status.COMPLETED
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{task.id}-{ordinal}-{lab}@protocol-tracker",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{due:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{due + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{ics_text(('✅ ' if done else '') + sub.title)}",
+            f"DESCRIPTION:{ics_text(f'{task.task} ({task.project}) · {sub.status}')}",
+            "TRANSP:TRANSPARENT",
+            "END:VEVENT",
+        ]
+    return "".join(fold(line) for line in lines)
+
+
+def utc_stamp(timestamp):
+    # Replica timestamps are naive local time
+    return datetime.fromisoformat(timestamp).astimezone(timezone.utc)
+
+
+# One per lab, kept in its backend's cache. A feed is rebuilt only when its version (last history
+# row) moved, and then only the tasks whose updated_at changed are re-rendered; while the replica's
+# data_version stands still not even the version is queried.
+class FeedCache:
+    def __init__(self, replica, lab):
+        self.replica = replica
+        self.lab = lab
+        self.events = {}  # task id -> (updated_at, year, project, VEVENT text)
+        self.feeds = {}  # project (None = all) -> (version, year, etag, last_modified, body)
+        self.checked = set()  # feeds whose version was read since data_version last moved
+        self._data_version = None
+        self._lock = threading.Lock()
+
+    def feed(self, project=None):
+        # (etag, last_modified, body), or None when there is nothing to serve
+        year = date.today().year
+        with self._lock:
+            data_version = self.replica.data_version()
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self.checked = set()
+            cached = self.feeds.get(project)
+            if project not in self.checked or cached is None or cached[1] != year:
+                version, changed_at = self.replica.project_version(project)
+                self.checked.add(project)
+                if cached is None or cached[:2] != (version, year):
+                    cached = self._build(project, version, changed_at, year)
+                    if cached is None:
+                        self.feeds.pop(project, None)
+                        return None
+                    self.feeds[project] = cached
+            return cached[2:]
+
+    def _build(self, project, version, changed_at, year):
+        versions = self.replica.task_versions(project)
+        if not versions:
+            return None
+        stale = [
+            task_id for task_id, updated_at in versions.items()
+            if self.events.get(task_id, (None, None))[:2] != (updated_at, year)
+        ]
+        for task in self.replica.tasks_by_id(stale):
+            stamp = f"{utc_stamp(versions[task.id]):%Y%m%dT%H%M%SZ}"
+            self.events[task.id] = (versions[task.id], year, task.project, task_events(task, year, stamp, self.lab))
+        # Archived tasks leave the cache with the next build of a feed that covered them
+        for task_id in [
+            task_id for task_id, (_, _, task_project, _) in self.events.items()
+            if task_id not in versions and project in (None, task_project)
+        ]:
+            del self.events[task_id]
+        body = "".join([
+            "BEGIN:VCALENDAR\r\n",
+            "VERSION:2.0\r\n",
+            f"PRODID:{PRODID}\r\n",
+            fold(f"X-WR-CALNAME:{ics_text(project or 'Protocol Tracker')}"),
+            *(self.events[task_id][3] for task_id in sorted(versions)),
+            "END:VCALENDAR\r\n",
+        ]).encode()
+        # changed_at is when the feed's last row reached this replica, so it never goes back; the
+        # body also moves on at New Year, when the same codes land in another year
+        last_modified = None
+        if changed_at:
+            last_modified = max(utc_stamp(changed_at), utc_stamp(f"{year}-01-01")).replace(microsecond=0)
+        return version, year, f'"{version}-{year}"', last_modified, body
+
+
+# --- HTTP server ---
+class FeedHandler(BaseHTTPRequestHandler):
+    # server.get_feeds(lab) returns that lab's FeedCache, or None for an unknown lab
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path != FEED_PATH:
+            return self.send_error(404)
+        if not hmac.compare_digest(query.get("token", ""), self.server.token):
+            return self.send_error(403)
+        feeds = self.server.get_feeds(query.get("lab"))
+        feed = feeds.feed(query.get("project")) if feeds is not None else None
+        if feed is None:
+            return self.send_error(404)
+        etag, last_modified, body = feed
+        if self.not_modified(etag, last_modified):
+            self.send_response(304)
+            self.send_validators(etag, last_modified)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_validators(etag, last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def not_modified(self, etag, last_modified):
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since and last_modified:
+            try:
+                return last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def send_validators(self, etag, last_modified):
+        self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", format_datetime(last_modified, usegmt=True))
+        # Clients may keep the feed but must revalidate, which costs a 304
+        self.send_header("Cache-Control", "no-cache")
+
+    def log_message(self, format, *args):
+        pass  # calendar clients poll often; keep the app's console quiet
+
+
+def start_feed_server(port, token, get_feeds, host="0.0.0.0"):
+    server = ThreadingHTTPServer((host, port), FeedHandler)
+    server.daemon_threads = True
+    server.token = token
+    server.get_feeds = get_feeds
+    threading.Thread(target=server.serve_forever, name="ics-feed", daemon=True).start()
+    return server
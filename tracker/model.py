@@ -0,0 +1,215 @@
+# --- Compact in-memory model for tasks and subtasks ---
+import difflib
+import itertools
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from enum import StrEnum
+from functools import lru_cache
+
+
+# StrEnum members are singletons that still compare equal to the stored strings
+class Status(StrEnum):
+    NOT_STARTED = "Not Started"
+    IN_PROGRESS = "In Progress"
+    COMPLETED = "Completed"
+    DELETED = "Deleted"
+
+
+@lru_cache(maxsize=None)
+def format_date(date):
+    # MMDD integer -> "March 14"; at most a few hundred distinct values ever exist
+    try:
+        return datetime.strptime(f"{date:04d}", "%m%d").strftime("%B %d")
+    except ValueError:
+        return f"Invalid date ({date:04d})"
+
+
+@dataclass(slots=True)
+class Subtask:
+    date: int  # MMDD as an integer, e.g. 314 for "0314"
+    title: str
+    status: Status = Status.NOT_STARTED
+
+    @property
+    def date_code(self):
+        return f"{self.date:04d}"
+
+    @property
+    def date_str(self):
+        return format_date(self.date)
+
+    def to_dict(self):
+        # Storage keeps the original JSON shape so existing logs stay readable
+        return {
+            "date_code": self.date_code,
+            "date_str": self.date_str,
+            "title": self.title,
+            "status": str(self.status),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(int(data["date_code"]), data["title"], Status(data["status"]))
+
+
+# Process-wide; a task gets a fresh version when created or loaded and on every mutation, so
+# (task id, version) names one exact state, e.g. for the render cache
+TASK_VERSIONS = itertools.count(1)
+
+
+@dataclass(slots=True)
+class Task:
+    project: str
+    task: str
+    description: str
+    status: Status
+    subtasks: list = field(default_factory=list)
+    id: int = None  # primary key assigned by storage; None until first saved
+    version: int = field(default_factory=lambda: next(TASK_VERSIONS), compare=False, repr=False)
+
+    @property
+    def key(self):
+        return self.project, self.task
+
+    @property
+    def is_done(self):
+        if self.status == Status.COMPLETED:
+            return True
+        return bool(self.subtasks) and all(sub.status == Status.COMPLETED for sub in self.subtasks)
+
+    def subtasks_to_dicts(self):
+        return [sub.to_dict() for sub in self.subtasks]
+
+    @classmethod
+    def from_record(cls, project, task, description, status, subtasks, task_id=None):
+        # Project names repeat across many tasks, so share one string object per name
+        return cls(
+            sys.intern(project),
+            task,
+            description or "",
+            Status(status),
+            [Subtask.from_dict(sub) for sub in subtasks],
+            task_id,
+        )
+
+
+SUBTASK_PATTERN = re.compile(r"(\d{4}):\s*(.+)")
+# difflib.get_close_matches' default cutoff: "step 1" -> "step 1 (thaw)" is a retitle
+RETITLE_SIMILARITY = 0.6
+
+
+def extract_subtasks(description_text):
+    subtasks = []
+    matches = SUBTASK_PATTERN.findall(description_text)
+    for code, text in matches:
+        # date_str is derived from the integer date when displayed
+        subtasks.append(Subtask(int(code), text))
+    return subtasks
+
+
+def merge_subtasks(old, new):
+    # Re-extracted subtasks keep the status of the old subtask they match: the same date and
+    # title first, then the same title (a rescheduled line), then the same date with a similar
+    # title (a retitled line). The last needs as many subtasks on that date as before, so a
+    # step deleted while another is added doesn't hand over its status. Each old subtask is
+    # used once, in order, so the result depends only on the inputs.
+    old_counts = Counter(sub.date for sub in old)
+    new_counts = Counter(sub.date for sub in new)
+
+    def retitled(a, b):
+        return (a.date == b.date and old_counts[a.date] == new_counts[b.date]
+                and difflib.SequenceMatcher(None, a.title, b.title).ratio() >= RETITLE_SIMILARITY)
+
+    unmatched = list(range(len(old)))
+    pending = list(range(len(new)))
+    for same in (lambda a, b: (a.date, a.title) == (b.date, b.title),
+                 lambda a, b: a.title == b.title,
+                 retitled):
+        for index in list(pending):
+            match = next((candidate for candidate in unmatched if same(old[candidate], new[index])), None)
+            if match is not None:
+                new[index].status = old[match].status
+                unmatched.remove(match)
+                pending.remove(index)
+    return new
+
+
+def reschedule_line(description_text, ordinal, date):
+    # Rewrites the MMDD code of the ordinal-th subtask line, leaving the rest as typed
+    matches = SUBTASK_PATTERN.finditer(description_text)
+    for index, match in enumerate(matches):
+        if index == ordinal:
+            return f"{description_text[:match.start()]}{date:04d}{description_text[match.start() + 4:]}"
+    return description_text
+
+
+def code_to_date(date_code, year):
+    # MMDD integer -> date in the given year; None for impossible codes (e.g. 0230)
+    try:
+        return date(year, date_code // 100, date_code % 100)
+    except ValueError:
+        return None
+
+
+def shift_code(date_code, days, year):
+    # MMDD moved by days, wrapping across the year end; impossible codes stay as they are
+    day = code_to_date(date_code, year)
+    if day is None:
+        return date_code
+    day += timedelta(days=days)
+    return day.month * 100 + day.day
+
+
+# --- Protocol templates: "D<offset>: step" lines, dated against a start day when used ---
+TEMPLATE_STEP_PATTERN = re.compile(r"^([ \t]*)D(-?\d+):[ \t]*(\S.*)", re.MULTILINE)
+
+
+def template_steps(template_text):
+    # (day offset, title) of each step, e.g. "D7: harvest" -> (7, "harvest")
+    return [(int(offset), title) for _, offset, title in TEMPLATE_STEP_PATTERN.findall(template_text)]
+
+
+def expand_template(template_text, start):
+    # The template as a description of MMDD: lines, which extract_subtasks reads as usual;
+    # other lines (notes) are kept as written
+    def dated(match):
+        indent, offset, title = match.groups()
+        return f"{indent}{start + timedelta(days=int(offset)):%m%d}: {title}"
+
+    return TEMPLATE_STEP_PATTERN.sub(dated, template_text)
+
+
+# --- Task index: O(1) lookup by id and by (project, task), iterates in load order ---
+class TaskIndex:
+    def __init__(self, tasks=()):
+        self.by_id = {}
+        self.by_key = {}
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        previous = self.by_key.get(task.key)
+        if previous is not None and previous.id != task.id:
+            del self.by_id[previous.id]
+        self.by_id[task.id] = task
+        self.by_key[task.key] = task
+
+    def remove(self, task_id):
+        task = self.by_id.pop(task_id)
+        del self.by_key[task.key]
+        return task
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def find(self, project, task):
+        return self.by_key.get((project, task))
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
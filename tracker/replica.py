@@ -0,0 +1,597 @@
+# --- Local SQLite replica: every read and write of the app lands here first ---
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from tracker.events import TASK_ARCHIVED, TASK_RESTORED, TASK_SAVED
+from tracker.model import Status, Task
+
+LOCAL_DB_PATH = "protocol_cache.db"
+
+
+def merge_key(row):
+    content = json.dumps([row["description"], row["status"], row["subtasks"]], sort_keys=True)
+    return datetime.fromisoformat(row["timestamp"]), content
+
+
+def remote_wins(current, row):
+    # Remote rows are reduced from the whole log plus our pending events, so they win
+    # unless we wrote something newer since (or they already match)
+    if current is None:
+        return True
+    current_time, current_content = merge_key(current)
+    row_time, row_content = merge_key(row)
+    return current_content != row_content and current_time <= row_time
+
+
+# --- Schema migrations, tracked in PRAGMA user_version ---
+# Local time of a history insert, taken by SQLite under the write lock so it follows the row ids
+RECORDED_AT = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+def create_replica_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            project TEXT NOT NULL,
+            task TEXT NOT NULL,
+            description TEXT,
+            status TEXT,
+            subtasks TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (project, task)
+        )''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS outbox (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            project TEXT NOT NULL,
+            task TEXT NOT NULL,
+            description TEXT,
+            status TEXT,
+            subtasks TEXT
+        )''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )''')
+
+def add_task_ids(conn):
+    # Integer primary keys give the app stable ids; (project, task) stays unique for log merges
+    conn.execute("ALTER TABLE tasks RENAME TO tasks_v1")
+    conn.execute('''
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project TEXT NOT NULL,
+            task TEXT NOT NULL,
+            description TEXT,
+            status TEXT,
+            subtasks TEXT,
+            updated_at TEXT NOT NULL,
+            UNIQUE (project, task)
+        )''')
+    conn.execute('''
+        INSERT INTO tasks (project, task, description, status, subtasks, updated_at)
+        SELECT project, task, description, status, subtasks, updated_at FROM tasks_v1 ORDER BY rowid''')
+    conn.execute("DROP TABLE tasks_v1")
+
+def create_archive_table(conn):
+    # Cold tier: same rows as tasks, kept out of hot loads and scans
+    conn.execute('''
+        CREATE TABLE archived_tasks (
+            id INTEGER PRIMARY KEY,
+            project TEXT NOT NULL,
+            task TEXT NOT NULL,
+            description TEXT,
+            status TEXT,
+            subtasks TEXT,
+            updated_at TEXT NOT NULL,
+            archived_at TEXT NOT NULL,
+            UNIQUE (project, task)
+        )''')
+
+def add_outbox_events(conn):
+    # Queued rows are events now; rows queued before this are full snapshots (event NULL)
+    conn.execute("ALTER TABLE outbox ADD COLUMN event TEXT")
+    conn.execute("ALTER TABLE outbox ADD COLUMN data TEXT")
+
+def create_history_table(conn):
+    # Every log row, local or remote; the unique index doubles as the per-task lookup
+    conn.execute('''
+        CREATE TABLE history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project TEXT NOT NULL,
+            task TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            event TEXT NOT NULL,
+            data TEXT,
+            description TEXT,
+            status TEXT,
+            subtasks TEXT,
+            UNIQUE (project, task, timestamp, event)
+        )''')
+
+def create_templates_table(conn):
+    # Protocol templates: "D<offset>: step" text, expanded against a start date when used
+    conn.execute('''
+        CREATE TABLE templates (
+            name TEXT PRIMARY KEY,
+            steps TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )''')
+
+def add_history_recorded_at(conn):
+    # When each row reached this replica. Event timestamps come from other machines and arrive
+    # late, so only this local time grows with the row id (rows from before count as now)
+    conn.execute("ALTER TABLE history ADD COLUMN recorded_at TEXT")
+    conn.execute(f"UPDATE history SET recorded_at = {RECORDED_AT}")
+
+MIGRATIONS = [
+    create_replica_tables,
+    add_task_ids,
+    create_archive_table,
+    add_outbox_events,
+    create_history_table,
+    create_templates_table,
+    add_history_recorded_at,
+]
+
+TASK_COLUMNS = "id, project, task, description, status, subtasks, updated_at"
+
+
+def migrate(conn, migrations):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(migrations[version:], start=version + 1):
+        conn.execute("BEGIN")
+        migration(conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+
+
+class LocalReplica:
+    def __init__(self, path=LOCAL_DB_PATH, outbox=True):
+        self.path = path
+        # Without a sync engine nothing drains the outbox, so local-only storage skips it
+        self.outbox = outbox
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        migrate(conn, MIGRATIONS)
+        conn.close()
+        # Held open only to watch PRAGMA data_version; it never writes
+        self._watch = sqlite3.connect(self.path, check_same_thread=False)
+        self._watch_lock = threading.Lock()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def close(self):
+        # Every other connection is per call; only the watch connection stays open
+        with self._watch_lock:
+            self._watch.close()
+
+    def data_version(self):
+        # Moves whenever any other connection, in this process or another, commits; reads no table
+        with self._watch_lock:
+            return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    # --- Reads ---
+    def load_tasks(self):
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, project, task, description, status, subtasks FROM tasks ORDER BY id"
+        ).fetchall()
+        conn.close()
+        return [
+            Task.from_record(project, task, description, status, json.loads(subtasks) if subtasks else [], task_id)
+            for task_id, project, task, description, status, subtasks in rows
+        ]
+
+    def find_tasks(self, keys):
+        # Looks up a few (project, task) keys through the unique index
+        conn = self._connect()
+        rows = [
+            row for key in keys
+            for row in conn.execute(
+                "SELECT id, project, task, description, status, subtasks FROM tasks WHERE project = ? AND task = ?", key)
+        ]
+        conn.close()
+        return [
+            Task.from_record(project, task, description, status, json.loads(subtasks) if subtasks else [], task_id)
+            for task_id, project, task, description, status, subtasks in rows
+        ]
+
+    def due_subtasks(self, today):
+        # (task id, subtask ordinal) of open subtasks due on or before today (MMDD int), oldest first;
+        # json_each walks the stored subtask lists inside SQLite, so no task is decoded here
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT tasks.id, CAST(sub.key AS INTEGER) FROM tasks, json_each(tasks.subtasks) AS sub
+            WHERE tasks.status != ?
+              AND json_extract(sub.value, '$.status') != ?
+              AND CAST(json_extract(sub.value, '$.date_code') AS INTEGER) <= ?
+            ORDER BY CAST(json_extract(sub.value, '$.date_code') AS INTEGER), tasks.id, sub.key''',
+            (str(Status.DELETED), str(Status.COMPLETED), today)).fetchall()
+        conn.close()
+        return rows
+
+    # --- Local writes (queued for the sync engine) ---
+    def save_task(self, task, event=TASK_SAVED, data=None):
+        return self.save_tasks([(task, event, data)])
+
+    def save_tasks(self, changes):
+        # Commits (task, event, data) changes in one transaction: each task's row is stored once
+        # with its full state, while only the events are queued. Events get consecutive
+        # microsecond timestamps, so several on one task replay in order and stay distinct
+        # in the history. Assigns task.id on first save; returns the last timestamp.
+        start = datetime.now()
+        records = []
+        tasks = {}
+        for offset, (task, event, data) in enumerate(changes):
+            timestamp = (start + timedelta(microseconds=offset)).isoformat()
+            values = (task.description, str(task.status), json.dumps(task.subtasks_to_dicts()))
+            snapshot = values if event == TASK_SAVED else (None, None, None)
+            records.append((timestamp, *task.key, *snapshot, event, None if data is None else str(data)))
+            tasks[id(task)] = (task, values, timestamp)
+        conn = self._connect()
+        with conn:
+            for task, values, timestamp in tasks.values():
+                if task.id is None:
+                    # A new task supersedes any archived task with the same (project, task)
+                    conn.execute("DELETE FROM archived_tasks WHERE project = ? AND task = ?", task.key)
+                    conn.execute('''
+                        INSERT INTO tasks (project, task, description, status, subtasks, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (project, task) DO UPDATE SET
+                            description = excluded.description,
+                            status = excluded.status,
+                            subtasks = excluded.subtasks,
+                            updated_at = excluded.updated_at''',
+                        (*task.key, *values, timestamp))
+                    (task.id,) = conn.execute(
+                        "SELECT id FROM tasks WHERE project = ? AND task = ?", task.key
+                    ).fetchone()
+                else:
+                    conn.execute(
+                        "UPDATE tasks SET description = ?, status = ?, subtasks = ?, updated_at = ? WHERE id = ?",
+                        (*values, timestamp, task.id))
+            if self.outbox:
+                conn.executemany('''
+                    INSERT INTO outbox (timestamp, project, task, description, status, subtasks, event, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', records)
+            conn.executemany(f'''
+                INSERT OR IGNORE INTO history
+                    (timestamp, project, task, description, status, subtasks, event, data, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, {RECORDED_AT})''', records)
+        conn.close()
+        return records[-1][0] if records else None
+
+    # --- Sync engine hooks ---
+    def pending_rows(self):
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT seq, timestamp, project, task, description, status, subtasks, event, data FROM outbox ORDER BY seq"
+        ).fetchall()
+        conn.close()
+        return [{
+            "seq": seq,
+            "timestamp": timestamp,
+            "project": project,
+            "task": task,
+            "description": description,
+            "status": status,
+            "subtasks": json.loads(subtasks) if subtasks is not None else None,
+            "event": event or TASK_SAVED,
+            "data": data,
+        } for seq, timestamp, project, task, description, status, subtasks, event, data in rows]
+
+    def pending_count(self):
+        conn = self._connect()
+        (count,) = conn.execute("SELECT COUNT(*) FROM outbox").fetchone()
+        conn.close()
+        return count
+
+    def mark_pushed(self, seqs):
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM outbox WHERE seq = ?", [(seq,) for seq in seqs])
+        conn.close()
+
+    def merge_remote(self, latest):
+        # Apply reduced remote rows that win against the local copy; returns how many changed.
+        # Only the projects in latest are read (a pulled partition holds one project), by index.
+        conn = self._connect()
+        local = {
+            (project, task): {
+                "timestamp": updated_at,
+                "description": description,
+                "status": status,
+                "subtasks": json.loads(subtasks) if subtasks else [],
+            }
+            for project_name in {project for project, _ in latest}
+            for project, task, description, status, subtasks, updated_at in conn.execute(
+                "SELECT project, task, description, status, subtasks, updated_at FROM tasks WHERE project = ?",
+                (project_name,),
+            )
+        }
+        changed = 0
+        with conn:
+            for key, row in latest.items():
+                current = local.get(key)
+                archived = None
+                if current is None:
+                    # Archived rows are looked up by key only, never scanned
+                    archived = conn.execute(
+                        f"SELECT {TASK_COLUMNS} FROM archived_tasks WHERE project = ? AND task = ?", key
+                    ).fetchone()
+                    if archived is not None:
+                        task_id, _, _, description, status, subtasks, updated_at = archived
+                        current = {
+                            "timestamp": updated_at,
+                            "description": description,
+                            "status": status,
+                            "subtasks": json.loads(subtasks) if subtasks else [],
+                        }
+                if not remote_wins(current, row):
+                    continue
+                if archived is not None:
+                    # Someone changed an archived task remotely: bring it back to the hot set
+                    self._move(conn, "archived_tasks", "tasks", [task_id])
+                conn.execute('''
+                    INSERT INTO tasks (project, task, description, status, subtasks, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (project, task) DO UPDATE SET
+                        description = excluded.description,
+                        status = excluded.status,
+                        subtasks = excluded.subtasks,
+                        updated_at = excluded.updated_at''',
+                    (row["project"], row["task"], row["description"], row["status"],
+                     json.dumps(row["subtasks"]), row["timestamp"]))
+                changed += 1
+        conn.close()
+        return changed
+
+    # --- Change history ---
+    def add_history(self, rows):
+        # Rows already indexed (e.g. our own, seen again in the log) are ignored
+        conn = self._connect()
+        with conn:
+            conn.executemany(f'''
+                INSERT OR IGNORE INTO history
+                    (timestamp, project, task, description, status, subtasks, event, data, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, {RECORDED_AT})''',
+                [(row["timestamp"], row["project"], row["task"],
+                  row["description"] if row["event"] == TASK_SAVED else None, row["status"],
+                  json.dumps(row["subtasks"]) if row["event"] == TASK_SAVED else None,
+                  row["event"], row["data"])
+                 for row in rows])
+        conn.close()
+
+    def last_history_id(self):
+        conn = self._connect()
+        (last_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM history").fetchone()
+        conn.close()
+        return last_id
+
+    def history_since(self, last_id):
+        # History rows added after last_id, oldest first: (id, project, task, timestamp, event)
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, project, task, timestamp, event FROM history WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+        conn.close()
+        return rows
+
+    def task_history(self, project, task):
+        # Served from the (project, task, ...) index: cost follows this task's history, not the log
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT timestamp, description, status, subtasks, event, data FROM history
+            WHERE project = ? AND task = ? ORDER BY timestamp, id''',
+            (project, task)).fetchall()
+        conn.close()
+        return [{
+            "timestamp": timestamp,
+            "project": project,
+            "task": task,
+            "description": description,
+            "status": status,
+            "subtasks": json.loads(subtasks) if subtasks is not None else None,
+            "event": event,
+            "data": data,
+        } for timestamp, description, status, subtasks, event, data in rows]
+
+    # --- Per-project reads (reports) ---
+    def project_versions(self):
+        # {project: id of its last history row} for every project with hot tasks; any change
+        # to a project's tasks adds a history row, so an unchanged id means unchanged data
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT project, (SELECT COALESCE(MAX(id), 0) FROM history WHERE history.project = tasks.project)
+            FROM tasks GROUP BY project''').fetchall()
+        conn.close()
+        return dict(rows)
+
+    def project_version(self, project=None):
+        # (id, recorded_at) of the last history row of one project, or of any project; (0, None) if none
+        conn = self._connect()
+        if project is None:
+            row = conn.execute("SELECT id, recorded_at FROM history ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = conn.execute(
+                "SELECT id, recorded_at FROM history WHERE project = ? ORDER BY id DESC LIMIT 1", (project,)
+            ).fetchone()
+        conn.close()
+        return row or (0, None)
+
+    def task_versions(self, project=None):
+        # {id: updated_at} of hot tasks (of one project); tells which tasks changed without decoding any
+        conn = self._connect()
+        if project is None:
+            rows = conn.execute("SELECT id, updated_at FROM tasks").fetchall()
+        else:
+            rows = conn.execute("SELECT id, updated_at FROM tasks WHERE project = ?", (project,)).fetchall()
+        conn.close()
+        return dict(rows)
+
+    def tasks_by_id(self, task_ids):
+        conn = self._connect()
+        rows = []
+        task_ids = list(task_ids)
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(task_ids), 500):
+            chunk = task_ids[start:start + 500]
+            rows += conn.execute(
+                f"SELECT id, project, task, description, status, subtasks FROM tasks "
+                f"WHERE id IN ({', '.join('?' * len(chunk))})", chunk).fetchall()
+        conn.close()
+        return [
+            Task.from_record(project, task, description, status, json.loads(subtasks) if subtasks else [], task_id)
+            for task_id, project, task, description, status, subtasks in rows
+        ]
+
+    def project_tasks(self, project):
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT id, project, task, description, status, subtasks FROM tasks WHERE project = ? ORDER BY id",
+            (project,)).fetchall()
+        conn.close()
+        return [
+            Task.from_record(project, task, description, status, json.loads(subtasks) if subtasks else [], task_id)
+            for task_id, project, task, description, status, subtasks in rows
+        ]
+
+    def project_history(self, project, since, until):
+        # Full history of every task of the project with a row in [since, until), in one query
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT task, timestamp, description, status, subtasks, event, data FROM history
+            WHERE project = ? AND task IN (
+                SELECT task FROM history WHERE project = ? AND timestamp >= ? AND timestamp < ?)
+            ORDER BY task, timestamp, id''',
+            (project, project, since, until)).fetchall()
+        conn.close()
+        return [{
+            "timestamp": timestamp,
+            "project": project,
+            "task": task,
+            "description": description,
+            "status": status,
+            "subtasks": json.loads(subtasks) if subtasks is not None else None,
+            "event": event,
+            "data": data,
+        } for task, timestamp, description, status, subtasks, event, data in rows]
+
+    # --- Archive tier ---
+    def _move(self, conn, source, target, task_ids):
+        # Also leaves a history row per task, so other sessions and processes see the move
+        marks = ", ".join("?" * len(task_ids))
+        event = TASK_ARCHIVED if target == "archived_tasks" else TASK_RESTORED
+        conn.execute(
+            f"INSERT OR IGNORE INTO history (timestamp, project, task, event, recorded_at) "
+            f"SELECT ?, project, task, ?, {RECORDED_AT} FROM {source} WHERE id IN ({marks})",
+            (datetime.now().isoformat(), event, *task_ids))
+        if target == "archived_tasks":
+            conn.execute(
+                f"INSERT INTO archived_tasks ({TASK_COLUMNS}, archived_at) "
+                f"SELECT {TASK_COLUMNS}, ? FROM tasks WHERE id IN ({marks})",
+                (datetime.now().isoformat(), *task_ids))
+        else:
+            conn.execute(
+                f"INSERT INTO tasks ({TASK_COLUMNS}) SELECT {TASK_COLUMNS} FROM archived_tasks WHERE id IN ({marks})",
+                task_ids)
+        conn.execute(f"DELETE FROM {source} WHERE id IN ({marks})", task_ids)
+
+    def archive_candidates(self, untouched_days=None):
+        # Tasks of fully completed projects, plus (optionally) tasks not touched for N days
+        tasks = self.load_tasks()
+        conn = self._connect()
+        updated = dict(conn.execute("SELECT id, updated_at FROM tasks"))
+        conn.close()
+
+        projects = {}
+        for task in tasks:
+            projects.setdefault(task.project, []).append(task)
+        task_ids = set()
+        for project_tasks in projects.values():
+            if all(task.is_done or task.status == Status.DELETED for task in project_tasks):
+                task_ids.update(task.id for task in project_tasks)
+        if untouched_days is not None:
+            cutoff = datetime.now() - timedelta(days=untouched_days)
+            task_ids.update(
+                task_id for task_id, updated_at in updated.items()
+                if datetime.fromisoformat(updated_at) < cutoff
+            )
+        return sorted(task_ids)
+
+    def archive_tasks(self, task_ids):
+        if not task_ids:
+            return 0
+        conn = self._connect()
+        with conn:
+            self._move(conn, "tasks", "archived_tasks", list(task_ids))
+        conn.close()
+        return len(task_ids)
+
+    def restore_task(self, task_id):
+        conn = self._connect()
+        with conn:
+            self._move(conn, "archived_tasks", "tasks", [task_id])
+        conn.close()
+
+    def search_archive(self, query="", limit=50):
+        pattern = f"%{query}%"
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT id, project, task, description, status, subtasks, archived_at FROM archived_tasks
+            WHERE project LIKE ? OR task LIKE ? OR description LIKE ?
+            ORDER BY archived_at DESC, id LIMIT ?''',
+            (pattern, pattern, pattern, limit)).fetchall()
+        conn.close()
+        return [
+            (Task.from_record(project, task, description, status, json.loads(subtasks) if subtasks else [], task_id),
+             archived_at)
+            for task_id, project, task, description, status, subtasks, archived_at in rows
+        ]
+
+    def archive_count(self):
+        conn = self._connect()
+        (count,) = conn.execute("SELECT COUNT(*) FROM archived_tasks").fetchone()
+        conn.close()
+        return count
+
+    # --- Protocol templates ---
+    def load_templates(self):
+        conn = self._connect()
+        rows = conn.execute("SELECT name, steps FROM templates ORDER BY name").fetchall()
+        conn.close()
+        return dict(rows)
+
+    def save_template(self, name, steps):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO templates (name, steps, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET steps = excluded.steps, updated_at = excluded.updated_at",
+                (name, steps, datetime.now().isoformat()))
+        conn.close()
+
+    def delete_template(self, name):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM templates WHERE name = ?", (name,))
+        conn.close()
+
+    def get_state(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def set_state(self, key, value):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value))
+        conn.close()
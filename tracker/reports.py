@@ -0,0 +1,180 @@
+# --- Weekly project reports: built in worker processes, cached by each project's data version ---
+import csv
+import difflib
+import html
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+from tracker.events import DESCRIPTION_EVENTS, SUBTASK_COMPLETED, replay_history
+from tracker.model import Status
+from tracker.replica import LocalReplica
+
+REPORT_WORKERS = 2
+REPORT_DAYS = 7
+REPORT_COLUMNS = ["Section", "Task", "Subtask", "Due", "When", "Detail"]
+# The directory holding the tracker package, so workers import the same code
+PACKAGE_ROOT = str(Path(__file__).resolve().parents[1])
+
+
+# --- Worker processes ---
+# Each report is built by a `python -m tracker.reports` child, so the work never holds this
+# process's GIL. (multiprocessing's spawn would re-run the Streamlit script in every worker,
+# since Streamlit installs the script as __main__.) The pool's threads only wait on children.
+def start_pool(workers=REPORT_WORKERS):
+    return ThreadPoolExecutor(workers, thread_name_prefix="report")
+
+
+def run_worker(path, project, week_end):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PACKAGE_ROOT, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-m", "tracker.reports", os.path.abspath(path), project, week_end.isoformat()],
+        capture_output=True, env=env,
+    )
+    if result.returncode != 0:
+        lines = result.stderr.decode(errors="replace").strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"report worker exited with {result.returncode}")
+    report = json.loads(result.stdout)
+    report["week_end"] = date.fromisoformat(report["week_end"])
+    return report
+
+
+def changed_lines(before, after):
+    diff = difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="", n=0)
+    added = removed = 0
+    for line in diff:
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return f"+{added} / -{removed} lines"
+
+
+def report_rows(replica, project, week_end):
+    # Completions and description changes during the week ending week_end, then open subtasks
+    # due before it; titles are the subtask's as of the event, replayed from the task's history
+    since = (week_end - timedelta(days=REPORT_DAYS - 1)).isoformat()
+    until = (week_end + timedelta(days=1)).isoformat()
+    histories = {}
+    for row in replica.project_history(project, since, until):
+        histories.setdefault(row["task"], []).append(row)
+    rows = []
+    for task, history in histories.items():
+        for row, before, state in replay_history(history):
+            if not since <= row["timestamp"] < until:
+                continue
+            when = row["timestamp"][:16].replace("T", " ")
+            if row["event"] == SUBTASK_COMPLETED:
+                ordinal = int(row["data"])
+                if ordinal < len(state.subtasks):
+                    sub = state.subtasks[ordinal]
+                    rows.append(["Completed", task, sub.title, sub.date_str, when, ""])
+            elif row["event"] in DESCRIPTION_EVENTS and before is not None and before != state.description:
+                rows.append(["Description changed", task, "", "", when, changed_lines(before, state.description)])
+
+    week_end_num = week_end.month * 100 + week_end.day
+    for task in replica.project_tasks(project):
+        if task.status == Status.DELETED:
+            continue
+        rows.extend(
+            ["Overdue", task.task, sub.title, sub.date_str, "", ""]
+            for sub in task.subtasks
+            if sub.status != Status.COMPLETED and sub.date < week_end_num
+        )
+    return rows
+
+
+def render_html(project, week_end, rows, counts):
+    cells = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(value)}</td>" for value in row) + "</tr>" for row in rows
+    )
+    header = "".join(f"<th>{column}</th>" for column in REPORT_COLUMNS)
+    return (
+        f"<h3>{html.escape(project)}: week ending {week_end:%B %d, %Y}</h3>"
+        f"<p>✅ {counts['Completed']} completed · ⚠️ {counts['Overdue']} overdue · "
+        f"✏️ {counts['Description changed']} description change(s)</p>"
+        f"<table><thead><tr>{header}</tr></thead><tbody>{cells}</tbody></table>"
+    )
+
+
+def build_report(path, project, week_end):
+    # Runs in the worker process on its own connections
+    replica = LocalReplica(path, outbox=False)
+    try:
+        rows = report_rows(replica, project, week_end)
+    finally:
+        replica.close()
+    counts = {section: 0 for section in ("Completed", "Overdue", "Description changed")}
+    for row in rows:
+        counts[row[0]] += 1
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_COLUMNS)
+    writer.writerows(rows)
+    return {
+        "project": project,
+        "week_end": week_end.isoformat(),
+        "counts": counts,
+        "html": render_html(project, week_end, rows, counts),
+        "csv": buffer.getvalue(),
+    }
+
+
+def failed(future):
+    return future.done() and (future.cancelled() or future.exception() is not None)
+
+
+# One per lab, on a pool shared by the process. Jobs are keyed by (project, week end) and
+# remember the project version they were built from; only projects whose version moved are rebuilt.
+class ReportJobs:
+    def __init__(self, replica, pool):
+        self.replica = replica
+        self.pool = pool
+        self.jobs = {}  # (project, week_end) -> (version, future)
+        self.lock = threading.Lock()
+
+    def submit(self, week_end):
+        # Queues the week's report of every project with new data; returns how many were queued
+        versions = self.replica.project_versions()
+        queued = 0
+        with self.lock:
+            for key in [key for key in self.jobs if key[0] not in versions]:
+                self.jobs.pop(key)[1].cancel()  # project archived or gone
+            for project, version in versions.items():
+                job = self.jobs.get((project, week_end))
+                if job is not None and job[0] == version and not failed(job[1]):
+                    continue
+                if job is not None:
+                    job[1].cancel()
+                future = self.pool.submit(run_worker, self.replica.path, project, week_end)
+                self.jobs[(project, week_end)] = (version, future)
+                queued += 1
+        return queued
+
+    def reports(self, week_end):
+        # [(project, future)] of the week, by project name
+        with self.lock:
+            return sorted(
+                ((project, future) for (project, end), (_, future) in self.jobs.items() if end == week_end),
+                key=lambda job: job[0],
+            )
+
+    def close(self):
+        # The pool outlives a lab; only this lab's queued jobs are dropped (running ones finish)
+        with self.lock:
+            for _, future in self.jobs.values():
+                future.cancel()
+            self.jobs.clear()
+
+
+if __name__ == "__main__":
+    # python -m tracker.reports <replica path> <project> <week end, YYYY-MM-DD>: report JSON on stdout
+    # (ASCII-escaped, so any console encoding carries it)
+    report = build_report(sys.argv[1], sys.argv[2], date.fromisoformat(sys.argv[3]))
+    sys.stdout.write(json.dumps(report))
@@ -0,0 +1,368 @@
+# --- Shared storage for the Dropbox app: local replica + background sync, one per process ---
+import logging
+import os
+from datetime import date
+from urllib.parse import urlencode
+
+import streamlit as st
+
+from tracker.events import (
+    DESCRIPTION_PATCHED,
+    SUBTASK_COMPLETED,
+    SUBTASK_RESCHEDULED,
+    TASK_COMPLETED,
+    TASK_DELETED,
+    TASK_SAVED,
+    apply_event,
+    description_patch,
+)
+from tracker.model import Status, TaskIndex, code_to_date, shift_code
+from tracker.backends import DropboxBackend, SqliteBackend
+from tracker.replica import LOCAL_DB_PATH
+from tracker.tenants import DEFAULT_LAB, MAX_OPEN_LABS, TenantPool, lab_db_path, lab_dropbox_root, lab_slug
+
+
+# --- Dropbox Setup ---
+# dropbox/requests are imported here so they load on the sync thread, not at startup
+def get_dropbox_client_from_refresh():
+    import dropbox
+    import requests
+
+    from tracker.throttle import RateLimitedClient
+
+    token_url = "https://api.dropbox.com/oauth2/token"
+    data = {
+        "refresh_token": st.secrets["dropbox"]["refresh_token"],
+        "grant_type": "refresh_token",
+        "client_id": st.secrets["dropbox"]["app_key"],
+        "client_secret": st.secrets["dropbox"]["app_secret"]
+    }
+    response = requests.post(token_url, data=data)
+    response.raise_for_status()
+    access_token = response.json()["access_token"]
+    # Rate limits are handled by the wrapper (shared token bucket, jittered backoff), not the SDK
+    return RateLimitedClient(dropbox.Dropbox(access_token, max_retries_on_rate_limit=0))
+
+
+def get_log_compression():
+    # compression = "gzip" (or "zstd") under [dropbox] in secrets.toml; set it once every
+    # client runs a version that reads compressed logs. Without secrets logs stay plain CSV.
+    try:
+        return st.secrets["dropbox"].get("compression")
+    except (KeyError, FileNotFoundError):
+        return None
+
+
+# --- Storage: chosen by [storage] backend = "dropbox" | "sqlite" in secrets.toml ---
+# Dropbox (the default) keeps a local SQLite replica synced to the per-project logs under
+# /protocol_tracker/projects/; sqlite keeps the same replica on this machine only.
+# Launchers (e.g. the offline app) call configure_storage() before the app runs instead.
+DEFAULT_STORAGE = {"backend": "dropbox"}
+storage_config = None
+
+
+def configure_storage(backend, **options):
+    global storage_config
+    storage_config = {"backend": backend, **options}
+
+
+def get_storage_config():
+    if storage_config is not None:
+        return storage_config
+    try:
+        return {**DEFAULT_STORAGE, **st.secrets["storage"]}
+    except (KeyError, FileNotFoundError):
+        return DEFAULT_STORAGE
+
+
+# --- Labs: each lab has its own replica file and Dropbox root, opened on first use ---
+# The lab comes from ?lab=<name>, else from the logged-in user's email via
+# [storage.labs] in secrets.toml, else the default lab (the single-lab layout).
+def open_backend(lab):
+    config = get_storage_config()
+    path = lab_db_path(config.get("path", LOCAL_DB_PATH), lab)
+    if config["backend"] == "dropbox":
+        return DropboxBackend(path, get_dropbox_client_from_refresh, get_log_compression(), lab_dropbox_root(lab))
+    if config["backend"] == "sqlite":
+        # Only the default lab takes over an old standalone tasks.db
+        return SqliteBackend(path, config.get("legacy_path") if lab == DEFAULT_LAB else None)
+    raise ValueError(f"Unknown storage backend: {config['backend']}")
+
+
+@st.cache_resource
+def get_tenants():
+    return TenantPool(open_backend, get_storage_config().get("max_open_labs", MAX_OPEN_LABS))
+
+
+def user_email():
+    # st.user is empty unless login is configured, and missing before Streamlit 1.42
+    user = getattr(st, "user", None)
+    return user.get("email") if user is not None else None
+
+
+def current_lab():
+    lab = st.query_params.get("lab")
+    if not lab and user_email():
+        lab = get_storage_config().get("labs", {}).get(user_email())
+    return lab_slug(lab or DEFAULT_LAB)
+
+
+def known_lab(lab):
+    # The default lab, labs named in [storage.labs] and labs that already have a replica;
+    # opening any other would create a replica (and a sync thread) for whatever a URL says
+    if lab == DEFAULT_LAB:
+        return True
+    config = get_storage_config()
+    if lab in {lab_slug(name) for name in config.get("labs", {}).values()}:
+        return True
+    return os.path.exists(lab_db_path(config.get("path", LOCAL_DB_PATH), lab))
+
+
+def get_backend():
+    lab = current_lab()
+    if not known_lab(lab):
+        raise ValueError(f"Unknown lab: {lab}")
+    return get_tenants().get(lab)
+
+
+def get_analytics():
+    # One per lab, kept with its backend; pandas/NumPy load once someone opens the dashboard
+    backend = get_backend()
+    if "analytics" not in backend.cache:
+        from tracker.analytics import DashboardAnalytics
+
+        backend.cache.setdefault("analytics", DashboardAnalytics(backend.replica))
+    return backend.cache["analytics"]
+
+
+@st.cache_resource
+def get_report_pool():
+    # Report workers shared by every lab
+    from tracker.reports import start_pool
+
+    return start_pool()
+
+
+def get_reports():
+    backend = get_backend()
+    if "reports" not in backend.cache:
+        from tracker.reports import ReportJobs
+
+        backend.cache.setdefault("reports", ReportJobs(backend.replica, get_report_pool()))
+    return backend.cache["reports"]
+
+
+# --- Calendar feeds: [calendar] port, token and (optionally) base_url in secrets.toml ---
+def get_calendar_config():
+    try:
+        return st.secrets["calendar"]
+    except (KeyError, FileNotFoundError):
+        return {}
+
+
+def get_feeds(backend, lab):
+    if "feeds" not in backend.cache:
+        from tracker.ics import FeedCache
+
+        backend.cache.setdefault("feeds", FeedCache(backend.replica, lab))
+    return backend.cache["feeds"]
+
+
+@st.cache_resource
+def get_feed_server():
+    # One per process, started with the app; None unless configured
+    config = get_calendar_config()
+    if not config.get("port") or not config.get("token"):
+        return None
+    from tracker.ics import start_feed_server
+
+    tenants = get_tenants()
+    path = get_storage_config().get("path", LOCAL_DB_PATH)
+
+    def lab_feeds(lab):
+        lab = lab_slug(lab or DEFAULT_LAB)
+        # Only labs that already have a replica are served, so a URL can't create one
+        # (nor open an empty one for a lab that is merely listed)
+        if not os.path.exists(lab_db_path(path, lab)):
+            return None
+        return get_feeds(tenants.get(lab, touch=False), lab)
+
+    try:
+        return start_feed_server(int(config["port"]), config["token"], lab_feeds)
+    except OSError as e:
+        # Port taken (e.g. by another app process): run without feeds rather than fail every rerun
+        logging.getLogger(__name__).warning("Calendar feeds off, port %s unavailable: %s", config["port"], e)
+        return None
+
+
+def feed_url(project=None):
+    # Subscription URL of a project's feed (or the whole lab's); None while feeds are off
+    server = get_feed_server()
+    if server is None:
+        return None
+    from tracker.ics import FEED_PATH
+
+    base_url = get_calendar_config().get("base_url", f"http://localhost:{server.server_address[1]}")
+    params = {"lab": current_lab(), **({"project": project} if project else {}), "token": server.token}
+    return f"{base_url.rstrip('/')}{FEED_PATH}?{urlencode(params)}"
+
+
+def save_task(task, event=TASK_SAVED, data=None):
+    get_backend().save_task(task, event, data)
+
+
+def record_event(task, event, data=None, key=None):
+    # Apply a mutation in memory and queue only the compact event for the log
+    record_events([(task, event, data)], key)
+
+
+def record_events(changes, key=None):
+    # Bulk actions: every (task, event, data) is applied, then committed as one write.
+    # The backend writes only the events that change the stored task and drops an action
+    # whose key it has seen (see action_key).
+    for task, event, data in changes:
+        apply_event(task, event, data)
+    get_backend().save_tasks(changes, key)
+
+
+def action_key(action, task, *args):
+    # Idempotency key of a button, taken when it is drawn: a replayed click carries the same
+    # one, while a click on the redrawn button (new task version) is a new action
+    return ":".join(map(str, [action, task.id, task.version, *args]))
+
+
+def load_tasks():
+    return get_backend().load_tasks()
+
+
+def due_subtasks(today_num):
+    # (task, sub_idx) of open subtasks due on or before today, oldest first, from the backend's
+    # query; tasks come from this session's index (ids it hasn't loaded yet are left out)
+    tasks = st.session_state.tasks
+    due = []
+    for task_id, sub_idx in get_backend().due_subtasks(today_num):
+        task = tasks.get(task_id)
+        if task is not None and sub_idx < len(task.subtasks):
+            due.append((task, sub_idx))
+    return due
+
+
+# --- Change feed: other sessions, processes and sync pulls all write the replica ---
+# The history table is the feed: its ids are a monotonic version and each row names one changed task.
+LIVE_UPDATE_SECONDS = 5
+
+
+def reload_tasks():
+    replica = get_backend().replica
+    st.session_state.lab = current_lab()
+    # Read the markers first: anything committed meanwhile is simply picked up again later
+    st.session_state.data_version = replica.data_version()
+    st.session_state.history_cursor = replica.last_history_id()
+    st.session_state.tasks = TaskIndex(load_tasks())
+
+
+def refresh_changed_tasks():
+    # PRAGMA data_version makes the check free; returns whether any task in this session changed
+    replica = get_backend().replica
+    data_version = replica.data_version()
+    if data_version == st.session_state.data_version:
+        return False
+    st.session_state.data_version = data_version
+    rows = replica.history_since(st.session_state.history_cursor)
+    if not rows:
+        return False
+    st.session_state.history_cursor = rows[-1][0]
+    keys = {(project, task) for _, project, task, _, _ in rows}
+    found = {task.key: task for task in replica.find_tasks(keys)}
+    tasks = st.session_state.tasks
+    changed = False
+    for key in keys:
+        current = tasks.find(*key)
+        if key in found:
+            # Our own writes come back identical to what this session already shows
+            if found[key] != current:
+                tasks.add(found[key])
+                changed = True
+        elif current is not None:
+            tasks.remove(current.id)  # archived
+            changed = True
+    return changed
+
+
+@st.fragment(run_every=LIVE_UPDATE_SECONDS)
+def watch_changes():
+    # Polls the feed in the background; the page is only redrawn when another writer changed a task
+    if refresh_changed_tasks():
+        st.rerun()
+
+
+def init_session():
+    if "tasks" not in st.session_state or st.session_state.lab != current_lab():
+        # First run, or the session switched labs: task ids and edit state belong to one lab
+        reload_tasks()
+        st.session_state.edit_mode = {}
+    else:
+        refresh_changed_tasks()
+
+
+def create_tasks(tasks):
+    # New tasks (e.g. one protocol across many projects), saved in one transaction
+    get_backend().save_tasks([(task, TASK_SAVED, None) for task in tasks])
+
+
+def schedule_start(task):
+    # The task's first open subtask as a date (this year), or None
+    first_open = next((sub for sub in task.subtasks if sub.status != Status.COMPLETED), None)
+    return first_open and code_to_date(first_open.date, date.today().year)
+
+
+def shift_schedule(task, start, key=None):
+    # Moves the first open subtask to start and the other open ones by as many days; completed
+    # ones keep their dates. Only the subtasks that move get an event, all in one write.
+    # Given as a target rather than a number of days, so repeating it changes nothing.
+    current = schedule_start(task)
+    if current is None or current == start:
+        return
+    year = date.today().year
+    days = (start - current).days
+    moves = [
+        (sub_idx, shift_code(sub.date, days, year))
+        for sub_idx, sub in enumerate(task.subtasks)
+        if sub.status != Status.COMPLETED
+    ]
+    changes = [
+        (task, SUBTASK_RESCHEDULED, f"{sub_idx}:{code:04d}")
+        for sub_idx, code in moves
+        if code != task.subtasks[sub_idx].date
+    ]
+    if changes:
+        record_events(changes, key)
+
+
+def complete_subtask(task, sub_idx, key=None):
+    record_event(task, SUBTASK_COMPLETED, sub_idx, key)
+
+
+def complete_subtasks(selection, key=None):
+    # selection: (task, sub_idx) pairs, however many tasks they span
+    record_events([(task, SUBTASK_COMPLETED, sub_idx) for task, sub_idx in selection], key)
+
+
+def reschedule_subtasks(selection, date, key=None):
+    # Moves the selected subtasks to date (MMDD int), keeping their status
+    record_events([(task, SUBTASK_RESCHEDULED, f"{sub_idx}:{date:04d}") for task, sub_idx in selection], key)
+
+
+def edit_description(task, description, key=None):
+    # Only the changed lines are logged; subtasks still in the text keep their status
+    patch = description_patch(task.description, description)
+    if patch is not None:
+        record_event(task, DESCRIPTION_PATCHED, patch, key)
+
+
+def complete_task(task, key=None):
+    record_event(task, TASK_COMPLETED, None, key)
+
+
+def delete_task(task, key=None):
+    record_event(task, TASK_DELETED, None, key)
@@ -0,0 +1,206 @@
+# --- Background sync engine: pushes the local outbox to Dropbox and pulls remote changes ---
+import tempfile
+import threading
+from datetime import datetime
+from itertools import chain
+
+from tracker.events import reduce_stream
+
+SYNC_INTERVAL_SECONDS = 30
+RETRY_DELAY_SECONDS = 5
+# Pulled rows are written to the history in batches, so memory doesn't grow with the log
+HISTORY_BATCH_ROWS = 5000
+
+
+def batches(rows, size=HISTORY_BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Engines on the same replica (a lab reopened while its old engine still flushes) take turns
+replica_locks = {}
+replica_locks_guard = threading.Lock()
+
+
+def replica_lock(path):
+    with replica_locks_guard:
+        return replica_locks.setdefault(path, threading.Lock())
+
+
+class SyncEngine:
+    def __init__(self, replica, client_factory, root=None, interval=SYNC_INTERVAL_SECONDS, compression=None):
+        self.replica = replica
+        self.client_factory = client_factory
+        self.root = root
+        self.interval = interval
+        # Applied to every log we upload; logs are read whatever their format
+        self.compression = compression
+        self.last_synced_at = None
+        self.last_error = None
+        self._dbx = None
+        self._manifest = None
+        self._manifest_rev = None
+        self._lock = replica_lock(replica.path)
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="dropbox-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def notify(self):
+        # Ask for a sync as soon as possible (e.g. right after a local write)
+        self._wake.set()
+
+    def stop(self):
+        # One last sync pushes whatever is queued, then the thread ends
+        self._stopped = True
+        self._wake.set()
+
+    def _client(self):
+        if self._dbx is None:
+            self._dbx = self.client_factory()
+        return self._dbx
+
+    def _partition_legacy_log(self, dbx, root, dropbox_log):
+        # One-time split of the single shared log into per-project partitions, streamed row by row
+        spools = {}
+        projects = {}
+        try:
+            with tempfile.TemporaryFile() as legacy:
+                dropbox_log.download_log(dbx, dropbox_log.legacy_log_path(root), legacy)
+                for batch in batches(dropbox_log.iter_log_rows(legacy)):
+                    by_project = {}
+                    for row in batch:
+                        by_project.setdefault(row["project"], []).append(row)
+                    for project, rows in by_project.items():
+                        if project not in spools:
+                            spools[project] = dropbox_log.new_log()
+                        dropbox_log.write_rows(spools[project], rows)
+            for project, spool in spools.items():
+                path = dropbox_log.partition_path(project, root)
+                # Partitions are only ever created, never overwritten: a client that split the log
+                # first may already have appended to its copy, so ours is dropped and the pull
+                # that follows merges theirs
+                dropbox_log.upload_new_log(dbx, spool, path, compression=self.compression)
+                projects[project] = path
+        finally:
+            for spool in spools.values():
+                spool.close()
+        manifest = {"version": 1, "projects": projects}
+        self._manifest, self._manifest_rev = dropbox_log.create_manifest(dbx, manifest, root)
+
+    def _index_history(self, spool, path, dropbox_log):
+        # Logs are append-only, so only rows past the indexed count are new to the history;
+        # a log that shrank (rewritten) is indexed again from the start. Returns the row count.
+        indexed = int(self.replica.get_state(f"indexed:{path}") or 0)
+        count = 0
+
+        def new_rows():
+            nonlocal count
+            for count, row in enumerate(dropbox_log.iter_log_rows(spool), start=1):
+                if count > indexed:
+                    yield row
+
+        for batch in batches(new_rows()):
+            self.replica.add_history(batch)
+        if count < indexed:
+            for batch in batches(dropbox_log.iter_log_rows(spool)):
+                self.replica.add_history(batch)
+        self.replica.set_state(f"indexed:{path}", str(count))
+        return count
+
+    def sync_once(self):
+        # The Dropbox SDK is only needed here, on the sync thread
+        from tracker import dropbox_log
+
+        root = self.root or dropbox_log.DROPBOX_ROOT
+        with self._lock:
+            dbx = self._client()
+            if self._manifest is None:
+                self._manifest, self._manifest_rev = dropbox_log.load_manifest(dbx, root)
+                if self._manifest is None:
+                    self._partition_legacy_log(dbx, root, dropbox_log)
+
+            pending_by_path = {}
+            for row in self.replica.pending_rows():
+                pending_by_path.setdefault(dropbox_log.partition_path(row["project"], root), []).append(row)
+
+            # Only partitions whose rev moved (or that were never indexed) are downloaded, in parallel
+            remote = dropbox_log.partition_revs(dbx, root)
+            stale = {
+                path for path, rev in remote.items()
+                if self.replica.get_state(f"rev:{path}") != rev or self.replica.get_state(f"indexed:{path}") is None
+            }
+            # Downloads are spooled to temp files and parsed one row at a time
+            downloaded = dropbox_log.download_partitions(dbx, stale | (pending_by_path.keys() & remote.keys()))
+            try:
+                self._pull_and_push(dbx, root, dropbox_log, stale, pending_by_path, downloaded)
+            finally:
+                for spool, _ in downloaded.values():
+                    spool.close()
+
+    def _pull_and_push(self, dbx, root, dropbox_log, stale, pending_by_path, downloaded):
+        counts = {}
+        for path in stale:
+            spool, rev = downloaded[path]
+            pending = pending_by_path.get(path, [])
+            # Replay our queued events on top, so concurrent edits to one task combine
+            rows = lambda: chain(dropbox_log.iter_log_rows(spool), pending)
+            self.replica.merge_remote(reduce_stream(rows(), rows))
+            # Indexed after the merge: sessions refresh the tasks named by new history rows
+            counts[path] = self._index_history(spool, path, dropbox_log)
+            self.replica.set_state(f"rev:{path}", rev)
+
+        # Register new projects before their partitions appear
+        new_projects = {
+            row["project"]: path
+            for path, rows in pending_by_path.items()
+            for row in rows
+            if row["project"] not in self._manifest["projects"]
+        }
+        if new_projects:
+            manifest = {**self._manifest, "projects": {**self._manifest["projects"], **new_projects}}
+            self._manifest_rev = dropbox_log.save_manifest(dbx, manifest, self._manifest_rev, root)
+            self._manifest = manifest
+
+        # Each write touches only its own project's partition
+        for path, rows in pending_by_path.items():
+            spool, rev = downloaded.get(path, (None, None))
+            log = dropbox_log.append_rows(spool, rows)
+            downloaded[path] = (log, rev)  # closed by the caller, like the downloads
+            rev = dropbox_log.upload_log(dbx, log, rev, path, compression=self.compression)
+            self.replica.mark_pushed([row["seq"] for row in rows])
+            self.replica.set_state(f"rev:{path}", rev)
+            # Our own rows were added to the history when they were saved
+            indexed = counts.get(path, int(self.replica.get_state(f"indexed:{path}") or 0))
+            self.replica.set_state(f"indexed:{path}", str(indexed + len(rows)))
+
+    def _run(self):
+        delay = RETRY_DELAY_SECONDS
+        while True:
+            try:
+                self.sync_once()
+            except Exception as e:
+                # Offline, token refresh failure or a write conflict: keep local data, retry later
+                self.last_error = str(e)
+                self._dbx = None
+                self._manifest = None
+                wait = delay
+                delay = min(delay * 2, self.interval)
+            else:
+                self.last_synced_at = datetime.now()
+                self.last_error = None
+                wait = self.interval
+                delay = RETRY_DELAY_SECONDS
+            if self._stopped:
+                return
+            self._wake.wait(wait)
+            self._wake.clear()
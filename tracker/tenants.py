@@ -0,0 +1,71 @@
+# --- Multi-lab tenancy: one replica / Dropbox root per lab, a bounded LRU of open backends ---
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_LAB = "default"
+# Open labs each hold a watch connection, a sync thread and cached state; past this many,
+# the least recently used ones are closed once they have been idle for IDLE_SECONDS
+MAX_OPEN_LABS = 8
+# An open page uses its lab every few seconds (the live-update poll), so a lab idle this long
+# has no session left that could still be holding its backend
+IDLE_SECONDS = 15 * 60
+# Other labs' partitions live under here; the default lab keeps /protocol_tracker itself
+LABS_DROPBOX_ROOT = "/protocol_tracker/labs"
+
+
+def lab_slug(name):
+    # Lab names come from URLs, so only [a-z0-9-] reaches file and Dropbox paths
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-")[:40] or DEFAULT_LAB
+
+
+def lab_db_path(path, lab):
+    # protocol_cache.db for the default lab, protocol_cache-<lab>.db next to it for the others
+    if lab == DEFAULT_LAB:
+        return path
+    path = Path(path)
+    return str(path.with_name(f"{path.stem}-{lab}{path.suffix}"))
+
+
+def lab_dropbox_root(lab):
+    return None if lab == DEFAULT_LAB else f"{LABS_DROPBOX_ROOT}/{lab}"
+
+
+class TenantPool:
+    def __init__(self, open_backend, capacity=MAX_OPEN_LABS, idle_seconds=IDLE_SECONDS, clock=time.monotonic):
+        self.open_backend = open_backend
+        self.capacity = capacity
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self.backends = OrderedDict()  # least recently used first
+        self.last_used = {}
+        self.lock = threading.Lock()
+
+    def get(self, lab, touch=True):
+        # touch=False looks a lab up without counting as use (e.g. a calendar feed request),
+        # so it neither keeps the lab open nor pushes a lab in use out
+        with self.lock:
+            now = self.clock()
+            backend = self.backends.get(lab)
+            if backend is None:
+                backend = self.backends[lab] = self.open_backend(lab)
+                self.last_used[lab] = now
+            elif touch:
+                self.backends.move_to_end(lab)
+                self.last_used[lab] = now
+            evicted = []
+            # Labs still in use are never closed under their sessions: with more of them
+            # than capacity the pool grows, and shrinks back as they go idle
+            for old in list(self.backends):
+                if len(self.backends) <= self.capacity or now - self.last_used[old] < self.idle_seconds:
+                    break
+                evicted.append(self.backends.pop(old))
+                del self.last_used[old]
+        for old in evicted:
+            old.close()
+        return backend
+
+    def __len__(self):
+        return len(self.backends)
@@ -0,0 +1,100 @@
+# --- Rate-limited Dropbox client: token bucket and Retry-After backoff ---
+import random
+import threading
+import time
+
+import dropbox
+
+# Requests per second across every client in the process, with short bursts allowed
+REQUESTS_PER_SECOND = 5
+BURST = 10
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_CAP_SECONDS = 60
+
+
+class TokenBucket:
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Blocks until a token is free; sleeps outside the lock so other threads can refill/take
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # A 429 applies to the whole app, so every caller waits out the Retry-After
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+# Shared by every client in the process: Dropbox limits per app and user, not per connection
+shared_bucket = TokenBucket()
+
+
+def is_throttled(error):
+    # 429s (too_many_requests / too_many_write_operations), plus write contention that
+    # Dropbox reports as a path error on uploads
+    if isinstance(error, dropbox.exceptions.RateLimitError):
+        return True
+    if isinstance(error, dropbox.exceptions.ApiError):
+        reason = error.error
+        if hasattr(reason, "is_too_many_write_operations") and reason.is_too_many_write_operations():
+            return True
+        if hasattr(reason, "is_path") and reason.is_path():
+            # UploadError wraps the WriteError in UploadWriteFailed; session finishes don't
+            write_error = reason.get_path()
+            write_error = getattr(write_error, "reason", write_error)
+            return hasattr(write_error, "is_too_many_write_operations") and write_error.is_too_many_write_operations()
+    return False
+
+
+def backoff_seconds(error, attempt):
+    # Honour Retry-After when the server sent one, otherwise full-jitter exponential backoff
+    retry_after = getattr(error, "backoff", None)
+    if retry_after is not None:
+        return retry_after + random.uniform(0, BACKOFF_BASE_SECONDS)
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class RateLimitedClient:
+    # Wraps dropbox.Dropbox (or anything with the same methods). Build the inner client with
+    # max_retries_on_rate_limit=0 so 429s reach this wrapper instead of the SDK's unjittered loop.
+    # Reads are not coalesced: each lab has one sync engine, whose syncs never overlap and
+    # fetch distinct paths, so identical requests are never in flight together.
+    def __init__(self, dbx, bucket=None):
+        self._dbx = dbx
+        self._bucket = bucket or shared_bucket
+
+    def __getattr__(self, name):
+        method = getattr(self._dbx, name)
+        if name.startswith("_") or not callable(method):
+            return method
+
+        def call(*args, **kwargs):
+            return self._call(method, args, kwargs)
+        return call
+
+    def _call(self, method, args, kwargs):
+        for attempt in range(MAX_RETRIES + 1):
+            self._bucket.acquire()
+            try:
+                return method(*args, **kwargs)
+            except dropbox.exceptions.DropboxException as e:
+                if not is_throttled(e) or attempt == MAX_RETRIES:
+                    raise
+                wait = backoff_seconds(e, attempt)
+                self._bucket.pause(wait)
+                time.sleep(wait)
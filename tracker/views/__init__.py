@@ -0,0 +1,23 @@
+# --- Page registry: each page lives in its own module, imported on first visit ---
+import importlib
+from collections import namedtuple
+
+Page = namedtuple("Page", ["label", "param", "module"])
+
+PAGES = {
+    "1": Page("🏠 Dashboard", "1 Dashboard", "tracker.views.dashboard"),
+    "2": Page("➕ Create Task", "2 Create Task", "tracker.views.create_task"),
+    "3": Page("📋 Current Tasks", "3 Current Tasks", "tracker.views.current_tasks"),
+    "4": Page("📅 Today's Subtasks", "4 Daily Tasks", "tracker.views.daily_tasks"),
+    "5": Page("📂 Project Overview", "5 Project Overview", "tracker.views.project_overview"),
+    "6": Page("🗄️ Archive", "6 Archive", "tracker.views.archive"),
+    "7": Page("📑 Reports", "7 Reports", "tracker.views.reports"),
+    "8": Page("📐 Templates", "8 Templates", "tracker.views.templates"),
+}
+
+
+def render_page(page):
+    # Only the active page's module (and whatever it imports) is loaded and run
+    if page not in PAGES:
+        return
+    importlib.import_module(PAGES[page].module).render()
@@ -0,0 +1,33 @@
+# --- Archive Page: cold tier for finished and stale tasks ---
+import streamlit as st
+
+from tracker.store import get_backend
+
+
+def render():
+    st.title("🗄️ Archive")
+    replica = get_backend().replica
+
+    st.markdown("### Move tasks to the archive")
+    st.caption("Archived tasks are left out of every page and scan, but can be searched and restored here.")
+    untouched_days = st.number_input("Also archive tasks untouched for this many days (0 = off)", min_value=0, value=0, step=30)
+    candidates = replica.archive_candidates(untouched_days or None)
+    if st.button(f"📦 Archive {len(candidates)} task(s) from completed projects" + (" or stale tasks" if untouched_days else ""), disabled=not candidates):
+        replica.archive_tasks(candidates)
+        st.success(f"Archived {len(candidates)} task(s).")
+        st.rerun()
+
+    st.markdown("---")
+    st.markdown(f"### Search the archive ({replica.archive_count()} task(s))")
+    query = st.text_input("Search by project, task or description")
+    results = replica.search_archive(query)
+    if not results:
+        st.info("No archived tasks found.")
+    for task, archived_at in results:
+        col1, col2 = st.columns([6, 1])
+        with col1:
+            st.markdown(f"**{task.task}** ({task.project}) · {task.status} · archived {archived_at[:10]}")
+        with col2:
+            if st.button("♻️ Restore", key=f"restore-{task.id}"):
+                replica.restore_task(task.id)
+                st.rerun()
@@ -0,0 +1,23 @@
+# --- Create Task Page ---
+import streamlit as st
+
+from tracker.model import Status, Task, extract_subtasks
+from tracker.store import save_task
+
+
+def render():
+    st.title("➕ Create a New Task")
+    project = st.text_input("Project Name")
+    task = st.text_input("Task")
+    description = st.text_area("Task Description (or steps)")
+    status = st.selectbox("Status", [Status.NOT_STARTED, Status.IN_PROGRESS, Status.COMPLETED])
+
+    if st.button("Save Task"):
+        if project and task:
+            new_task = Task(project, task, description, status, extract_subtasks(description))
+            save_task(new_task)
+            st.session_state.tasks.add(new_task)
+            st.success(f"Task '{task}' under project '{project}' saved!")
+            st.rerun()
+        else:
+            st.warning("Please fill in both Project and Task fields.")
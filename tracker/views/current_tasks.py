@@ -0,0 +1,114 @@
+# --- Current Tasks Page ---
+from datetime import date
+
+import streamlit as st
+
+from tracker.model import Status
+from tracker.store import (
+    action_key,
+    complete_subtask,
+    complete_task,
+    delete_task,
+    edit_description,
+    get_backend,
+    schedule_start,
+    shift_schedule,
+)
+from tracker.views.history import render_history
+from tracker.views.render_cache import render_cache
+
+
+def card_lines(task):
+    return [f"- [{sub.status}] **{sub.date_str}**: {sub.title}" for sub in task.subtasks]
+
+
+# Each card is a fragment: its buttons redraw only that card, not every task on the page
+@st.fragment
+def render_task_card(task):
+    st.markdown(f"### 🗂️ {task.task} ({task.project})")
+    st.markdown(f"**Main Status:** {task.status}")
+    # The description as typed, notes included
+    st.markdown("**Steps:**")
+    st.code(task.description, language=None)
+    if task.subtasks:
+        st.markdown("**Subtasks:**")
+        for sub_idx, line in enumerate(render_cache.get("card", task, date.today(), card_lines)):
+            s1, s2 = st.columns([10, 1])
+            with s1:
+                st.markdown(line)
+            with s2:
+                st.button("✅", key=f"complete-{task.id}-{sub_idx}", on_click=complete_subtask,
+                          args=(task, sub_idx, action_key("complete", task, sub_idx)))
+
+    # Keys of the actions below, taken before any of them changes the task
+    delete_key, save_key, shift_key, complete_key = (
+        action_key(action, task) for action in ("delete", "edit", "shift", "complete-task"))
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+    with col1:
+        if st.button("✏️ Edit", key=f"edit-{task.id}"):
+            st.session_state.edit_mode[task.id] = True
+    with col2:
+        if st.button("✅ Complete task", key=f"complete-task-{task.id}", disabled=task.status == Status.COMPLETED):
+            complete_task(task, complete_key)
+            st.rerun()  # the status filter may now leave the card out
+    with col3:
+        if st.button("🗑️ Delete", key=f"delete-{task.id}"):
+            delete_task(task, delete_key)
+            st.rerun()  # the card disappears, so the whole list has to be redrawn
+    with col4:
+        show_history = st.toggle("🕘 History", key=f"history-{task.id}")
+
+    if st.session_state.edit_mode.get(task.id, False):
+        new_desc = st.text_area("Edit Description", value=task.description, key=f"desc-edit-{task.id}")
+        if st.button("💾 Save", key=f"save-{task.id}"):
+            edit_description(task, new_desc, save_key)
+            st.session_state.edit_mode[task.id] = False
+            st.rerun(scope="fragment")
+
+        # Moving the start moves every open subtask by the same number of days
+        start = schedule_start(task)
+        if start:
+            new_start = st.date_input("Start date (first open subtask)", value=start, key=f"shift-start-{task.id}")
+            if st.button("📆 Shift schedule", key=f"shift-{task.id}", disabled=new_start == start):
+                shift_schedule(task, new_start, shift_key)
+                st.session_state.edit_mode[task.id] = False
+                st.rerun(scope="fragment")
+
+    if show_history:
+        render_history(task)
+
+
+def render():
+    st.title("📋 Current Tasks")
+
+    # The CSV is only built when asked for, not on every rerun
+    if st.button("📤 Export All Tasks to CSV", key="export-csv"):
+        st.download_button(
+            "⬇️ Download CSV", get_backend().export_csv(), file_name="all_tasks_export.csv", mime="text/csv",
+            key="download-csv")
+
+    filtered_tasks = [t for t in st.session_state.tasks if t.status != Status.DELETED]
+
+    projects = sorted(set(t.project for t in filtered_tasks))
+    selected_project = st.selectbox("Filter by Project", ["All Projects"] + projects)
+    statuses = sorted(set(str(t.status) for t in filtered_tasks))
+    selected_status = st.selectbox("Filter by Status", ["All Statuses"] + statuses)
+
+    project_tasks = [
+        t for t in filtered_tasks
+        if (selected_project == "All Projects" or t.project == selected_project)
+        and (selected_status == "All Statuses" or t.status == selected_status)
+    ]
+    if selected_project != "All Projects":
+        task_names = sorted(set(t.task for t in project_tasks))
+        selected_task = st.selectbox("Filter by Task", ["All Tasks"] + task_names)
+    else:
+        selected_task = "All Tasks"
+
+    # Newest first: ids are handed out as tasks reach this replica (created here, pulled from
+    # the log in creation order, or imported from tasks.db in its created order)
+    project_tasks.sort(key=lambda t: t.id, reverse=True)
+    for task in project_tasks:
+        if selected_task != "All Tasks" and task.task != selected_task:
+            continue
+        render_task_card(task)
@@ -0,0 +1,142 @@
+# --- Daily Tasks Page ---
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import streamlit as st
+
+from tracker.model import Status
+from tracker.store import (
+    action_key,
+    complete_subtask,
+    complete_subtasks,
+    due_subtasks,
+    edit_description,
+    reschedule_subtasks,
+)
+from tracker.views.render_cache import render_cache
+
+
+# --- Bulk actions: each one is a single write (one transaction, one log append) ---
+def selected_subtasks():
+    # (task, sub_idx) for every ticked checkbox; unticks them as it goes
+    selection = []
+    for key in [key for key in st.session_state if str(key).startswith("select-")]:
+        if st.session_state[key]:
+            _, task_id, sub_idx = key.split("-")
+            task = st.session_state.tasks.get(int(task_id))
+            if task is not None:
+                selection.append((task, int(sub_idx)))
+            st.session_state[key] = False
+    return selection
+
+
+def open_subtasks(tasks, matches):
+    return [
+        (task, sub_idx)
+        for task in tasks
+        if task.status != Status.DELETED
+        for sub_idx, sub in enumerate(task.subtasks)
+        if sub.status != Status.COMPLETED and matches(sub.date)
+    ]
+
+
+def complete_selected():
+    complete_subtasks(selected_subtasks())
+
+
+def complete_due_today(today_num):
+    complete_subtasks([(task, sub_idx) for task, sub_idx in due_subtasks(today_num)
+                       if task.subtasks[sub_idx].date == today_num])
+
+
+def complete_task_due(task, today_num, key):
+    complete_subtasks(open_subtasks([task], lambda date: date <= today_num), key)
+
+
+def shift_overdue(today_num):
+    reschedule_subtasks([(task, sub_idx) for task, sub_idx in due_subtasks(today_num)
+                         if task.subtasks[sub_idx].date < today_num], today_num)
+
+
+def daily_lines(task, today_num):
+    # (sub_idx, done, line HTML) of the subtasks the card shows: due by today, not completed before it
+    lines = []
+    for sub_idx, sub in enumerate(task.subtasks):
+        if sub.date > today_num:
+            continue
+        if sub.status == Status.COMPLETED:
+            if sub.date < today_num:
+                continue
+            lines.append((sub_idx, True, f"<span style='color:gray'><s>{sub.title}</s></span>"))
+        elif sub.date < today_num:
+            lines.append((sub_idx, False, f"<span style='color:red'>[Overdue] {sub.title}</span>"))
+        else:
+            lines.append((sub_idx, False, f"**{sub.title}**"))
+    return lines
+
+
+def cached_daily_lines(task, today_num):
+    return render_cache.get("daily", task, today_num, lambda task: daily_lines(task, today_num))
+
+
+@st.fragment
+def render_daily_card(task_id, today_num):
+    task = st.session_state.tasks.get(task_id)
+    col1, col2 = st.columns([6, 1])
+    with col1:
+        st.markdown(f"### 🔹 From Task: *{task.task}*, Project: *{task.project}*")
+    with col2:
+        if st.button("✏️ Edit", key=f"edit-{task_id}"):
+            st.session_state.edit_mode[task_id] = True
+        st.button("✅ All", key=f"complete-all-{task_id}", help="Complete every subtask of this task due by today",
+                  on_click=complete_task_due, args=(task, today_num, action_key("complete-due", task, today_num)))
+
+    if st.session_state.edit_mode.get(task_id, False):
+        new_desc = st.text_area("Edit Description", value=task.description, key=f"desc-edit-{task_id}")
+        if st.button("💾 Save", key=f"save-{task_id}"):
+            edit_description(task, new_desc, action_key("edit", task))
+            st.session_state.edit_mode[task_id] = False
+            st.rerun()  # due dates may have changed, so regroup the whole page
+
+    # Looked up here, not passed in: a fragment rerun after a click must see the new state
+    for sub_idx, done, line in cached_daily_lines(task, today_num):
+        col0, col1, col2 = st.columns([0.4, 6, 1])
+        with col0:
+            if not done:
+                st.checkbox("Select", key=f"select-{task_id}-{sub_idx}", label_visibility="collapsed")
+        with col1:
+            st.markdown(line, unsafe_allow_html=True)
+        with col2:
+            if not done:
+                st.button("✅", key=f"complete-today-{task_id}-{sub_idx}", on_click=complete_subtask,
+                          args=(task, sub_idx, action_key("complete", task, sub_idx)))
+
+
+def render():
+    st.title("📅 Today's Subtasks")
+
+    now_central = datetime.now(ZoneInfo("America/Chicago"))
+    today_code = now_central.strftime("%m%d")
+    today_num = int(today_code)
+
+    # Cards with something to show: subtasks due today or overdue, minus those completed before today
+    visible_tasks = [
+        task.id for task in st.session_state.tasks
+        if task.status != Status.DELETED and cached_daily_lines(task, today_num)
+    ]
+
+    if not visible_tasks:
+        st.info("No subtasks due today or earlier.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.button("✅ Complete selected", key="bulk-complete-selected", on_click=complete_selected)
+        with col2:
+            st.button("✅ Complete all due today", key="bulk-complete-today",
+                      on_click=complete_due_today, args=(today_num,))
+        with col3:
+            st.button("📆 Shift overdue to today", key="bulk-shift-overdue",
+                      on_click=shift_overdue, args=(today_num,))
+
+        for task_id in visible_tasks:
+            render_daily_card(task_id, today_num)
@@ -0,0 +1,74 @@
+# --- Dashboard Page ---
+from datetime import datetime
+
+import streamlit as st
+
+from tracker.store import due_subtasks, get_analytics
+
+
+def render():
+    st.title("📊 Protocol Tracker Dashboard")
+
+    total_projects = len(set(task.project for task in st.session_state.tasks))
+    total_tasks = len(st.session_state.tasks)
+
+    today = datetime.now()
+    today_code = today.strftime("%m%d")
+    today_num = int(today_code)
+
+    # Open subtasks due today or earlier, straight from storage (deleted tasks left out)
+    due_dates = [task.subtasks[sub_idx].date for task, sub_idx in due_subtasks(today_num)]
+    overdue_count = sum(date < today_num for date in due_dates)
+    today_count = len(due_dates) - overdue_count
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🧪 Total Projects", total_projects)
+    with col2:
+        st.metric("📂 Total Tasks", total_tasks)
+    with col3:
+        st.metric("⚠️ Overdue Subtasks", overdue_count)
+    with col4:
+        st.metric("📅 Today's Subtasks", today_count)
+
+    # Trends: cached per process, refreshed only when tasks changed
+    stats = get_analytics().refresh(today.date())
+    st.markdown("---")
+    st.markdown("### 📈 Trends")
+    period = st.radio("Completed subtasks per", ["Day", "Week"], horizontal=True)
+    throughput = stats["daily"] if period == "Day" else stats["weekly"]
+    if throughput.empty:
+        st.info("No completed subtasks in this period yet.")
+    else:
+        st.bar_chart(throughput)
+
+    col_age, col_lead = st.columns(2)
+    with col_age:
+        st.markdown("**⚠️ Overdue subtasks by age**")
+        st.bar_chart(stats["overdue"])
+    with col_lead:
+        avg_lead_time = stats["avg_lead_time"]
+        st.metric("⏱️ Avg lead time to completion", "–" if avg_lead_time is None else f"{avg_lead_time:.1f} days")
+        if not stats["lead_time"].empty:
+            st.dataframe(stats["lead_time"].round(1))
+
+    # Quick Navigation
+    st.markdown("---")
+    st.markdown("### Quick Navigation")
+    col_nav1, col_nav2 = st.columns(2)
+
+    with col_nav1:
+        if st.button("➕ Create Task", key="nav-create-btn"):
+            st.query_params.update({"page": "2"})
+            st.rerun()
+        if st.button("📋 View Tasks", key="nav-tasks-btn"):
+            st.query_params.update({"page": "3"})
+            st.rerun()
+
+    with col_nav2:
+        if st.button("📅 Daily Tasks", key="nav-daily-btn"):
+            st.query_params.update({"page": "4"})
+            st.rerun()
+        if st.button("📂 Project Overview", key="nav-projects-btn"):
+            st.query_params.update({"page": "5"})
+            st.rerun()
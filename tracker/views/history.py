@@ -0,0 +1,70 @@
+# --- Task History: timeline of one task's changes, shown inside its card ---
+import difflib
+from datetime import datetime
+
+import streamlit as st
+
+from tracker.events import (
+    DESCRIPTION_EDITED,
+    DESCRIPTION_EVENTS,
+    DESCRIPTION_PATCHED,
+    SUBTASK_COMPLETED,
+    SUBTASK_RESCHEDULED,
+    TASK_ARCHIVED,
+    TASK_COMPLETED,
+    TASK_DELETED,
+    TASK_RESTORED,
+    replay_history,
+)
+from tracker.store import get_backend
+
+
+def describe_change(row, before, task):
+    event = row["event"]
+    if event == SUBTASK_COMPLETED:
+        ordinal = int(row["data"])
+        if ordinal < len(task.subtasks):
+            sub = task.subtasks[ordinal]
+            return f"✅ Completed **{sub.date_str}**: {sub.title}"
+        return f"✅ Completed subtask #{ordinal + 1}"
+    if event == SUBTASK_RESCHEDULED:
+        ordinal = int(row["data"].split(":")[0])
+        if ordinal < len(task.subtasks):
+            sub = task.subtasks[ordinal]
+            return f"📆 Moved {sub.title} to **{sub.date_str}**"
+        return f"📆 Moved subtask #{ordinal + 1}"
+    if event in (DESCRIPTION_EDITED, DESCRIPTION_PATCHED):
+        return "✏️ Description edited"
+    if event == TASK_COMPLETED:
+        return "🏁 Task marked completed"
+    if event == TASK_DELETED:
+        return "🗑️ Deleted"
+    if event == TASK_ARCHIVED:
+        return "🗄️ Archived"
+    if event == TASK_RESTORED:
+        return "♻️ Restored from the archive"
+    if before is None:
+        return f"➕ Created ({task.status})"
+    return f"💾 Saved ({task.status})"
+
+
+def render_history(task):
+    rows = get_backend().replica.task_history(task.project, task.task)
+    if not rows:
+        st.caption("No history recorded yet.")
+        return
+
+    # Replay oldest first, show newest first
+    entries = []
+    for row, before, state in replay_history(rows):
+        diff = None
+        if row["event"] in DESCRIPTION_EVENTS and before is not None and before != state.description:
+            diff = "\n".join(difflib.unified_diff(
+                before.splitlines(), state.description.splitlines(), lineterm="", n=0
+            ))
+        entries.append((row["timestamp"], describe_change(row, before, state), diff))
+
+    for timestamp, label, diff in reversed(entries):
+        st.markdown(f"- `{datetime.fromisoformat(timestamp):%b %d %H:%M}` {label}")
+        if diff:
+            st.code(diff, language="diff")
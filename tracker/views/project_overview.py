@@ -0,0 +1,61 @@
+# --- Project Overview Page ---
+import streamlit as st
+
+from datetime import date
+
+from tracker.model import Status
+from tracker.store import feed_url
+from tracker.views.render_cache import render_cache
+
+SUBTASK_COLORS = {Status.COMPLETED: "green", Status.IN_PROGRESS: "orange"}
+
+
+def task_rank(task):
+    # (rank, label): open tasks first, then finished ones, then tasks without subtasks
+    if not task.subtasks:
+        return 2, "⚪️ No subtasks"
+    if all(sub.status == Status.COMPLETED for sub in task.subtasks):
+        return 1, "🟢"
+    return 0, "🔴"
+
+
+def overview_body(task):
+    # (details markdown, subtask lines HTML) for one task's expander
+    details = f"**Status:** {task.status}\n\n**Description:** {task.description}"
+    if not task.subtasks:
+        return details + "\n\n_No subtasks found._", None
+    lines = "<br>".join(
+        f"<span style='color:{SUBTASK_COLORS.get(sub.status, 'red')}'>[{sub.status}] {sub.date_str}: {sub.title}</span>"
+        for sub in task.subtasks
+    )
+    return details + "\n\n**Subtasks:**", lines
+
+
+def render():
+    st.title("📂 Project Overview")
+    today = date.today()
+
+    filtered_tasks = [t for t in st.session_state.tasks if t.status != Status.DELETED]
+
+    if filtered_tasks:
+        projects = {}
+        for task in filtered_tasks:
+            projects.setdefault(task.project, []).append(task)
+
+        cols = st.columns(len(projects)) if len(projects) <= 4 else st.columns(4)
+
+        for col, (project, task_list) in zip(cols * (len(projects) // len(cols) + 1), sorted(projects.items())):
+            with col:
+                st.markdown(f"### {project}")
+                url = feed_url(project)
+                if url:
+                    st.caption(f"📅 [Calendar feed]({url})")
+                for task in sorted(task_list, key=lambda task: task_rank(task)[0]):
+                    with st.expander(f"{task_rank(task)[1]}  {task.task}"):
+                        # Two pre-rendered blocks per task instead of one element per line
+                        details, lines = render_cache.get("overview", task, today, overview_body)
+                        st.markdown(details)
+                        if lines:
+                            st.markdown(lines, unsafe_allow_html=True)
+    else:
+        st.info("No projects or tasks available.")
@@ -0,0 +1,32 @@
+# --- Render cache: pre-built Markdown/HTML per task state, shared by every session ---
+import threading
+from collections import OrderedDict
+
+RENDER_CACHE_SIZE = 20000
+MISSING = object()
+
+
+class RenderCache:
+    # Bounded LRU keyed by (kind, task id, task version, today). A task's version changes with
+    # every mutation and reload, so stale entries are never hit; they just age out.
+    def __init__(self, maxsize=RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, kind, task, today, build):
+        key = (kind, task.id, task.version, today)
+        with self.lock:
+            value = self.entries.get(key, MISSING)
+            if value is not MISSING:
+                self.entries.move_to_end(key)
+                return value
+        value = build(task)
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+
+render_cache = RenderCache()
@@ -0,0 +1,55 @@
+# --- Reports Page: weekly per-project progress, built in the background ---
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from tracker.reports import REPORT_DAYS, failed
+from tracker.store import get_reports
+
+REPORT_POLL_SECONDS = 1
+
+
+@st.fragment(run_every=REPORT_POLL_SECONDS)
+def render_reports(week_end):
+    # Polls job progress without rerunning the page; each finished report is read once per poll
+    jobs = get_reports().reports(week_end)
+    done = sum(future.done() for _, future in jobs)
+    if done < len(jobs):
+        st.progress(done / len(jobs), text=f"⏳ Building reports… {done}/{len(jobs)}")
+
+    for project, future in jobs:
+        if not future.done():
+            st.markdown(f"⏳ **{project}**")
+            continue
+        if failed(future):
+            st.error(f"❌ {project}: {future.exception() if not future.cancelled() else 'cancelled'}")
+            continue
+        report = future.result()
+        counts = report["counts"]
+        label = (f"📂 {project} · ✅ {counts['Completed']} · ⚠️ {counts['Overdue']}"
+                 f" · ✏️ {counts['Description changed']}")
+        with st.expander(label):
+            st.html(report["html"])
+            name = f"{project}-{week_end:%Y-%m-%d}"
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("⬇️ HTML", report["html"], file_name=f"{name}.html", mime="text/html",
+                                   key=f"report-html-{project}")
+            with col2:
+                st.download_button("⬇️ CSV", report["csv"], file_name=f"{name}.csv", mime="text/csv",
+                                   key=f"report-csv-{project}")
+
+
+def render():
+    st.title("📑 Weekly Reports")
+    st.caption("Completed and overdue subtasks plus description changes, per project. "
+               "Reports are rebuilt in the background only for projects that changed.")
+
+    # History timestamps are this machine's local time, so the week is too
+    today = datetime.now().date()
+    week_end = st.date_input("Week ending", value=today, max_value=today)
+    st.caption(f"{week_end - timedelta(days=REPORT_DAYS - 1):%B %d} – {week_end:%B %d}")
+
+    # Opening the page keeps the week's reports current; unchanged projects are not requeued
+    get_reports().submit(week_end)
+    render_reports(week_end)
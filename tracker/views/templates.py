@@ -0,0 +1,75 @@
+# --- Templates Page: reusable protocols with day-offset steps, started in many projects at once ---
+from datetime import date
+
+import streamlit as st
+
+from tracker.model import Status, Task, expand_template, extract_subtasks, template_steps
+from tracker.store import create_tasks, get_backend
+
+
+def render():
+    st.title("📐 Protocol Templates")
+    replica = get_backend().replica
+    templates = replica.load_templates()
+
+    st.markdown("### Start a protocol")
+    if not templates:
+        st.info("No templates yet. Add one below.")
+    else:
+        name = st.selectbox("Template", list(templates))
+        task_name = st.text_input("Task", value=name)
+        start = st.date_input("Start date (D0)", value=date.today())
+        projects = sorted(set(task.project for task in st.session_state.tasks if task.status != Status.DELETED))
+        chosen = st.multiselect("Projects", projects)
+        extra = st.text_input("New projects (comma-separated)")
+        chosen += [project.strip() for project in extra.split(",") if project.strip() and project.strip() not in chosen]
+
+        description = expand_template(templates[name], start)
+        with st.expander("Preview"):
+            for sub in extract_subtasks(description):
+                st.markdown(f"- **{sub.date_str}**: {sub.title}")
+
+        # Saving over a task of the same name would replace it, running or not, so those projects are left out
+        taken = [project for project in chosen if st.session_state.tasks.find(project, task_name) is not None]
+        if taken:
+            st.warning(f"⚠️ '{task_name}' already exists in {', '.join(taken)}, so it won't be started there. "
+                       f"Give it another name (e.g. '{task_name} {start:%m%d}') to start it there too.")
+        chosen = [project for project in chosen if project not in taken]
+
+        if st.button(f"🚀 Start in {len(chosen)} project(s)", key="template-start",
+                     disabled=not (chosen and task_name)):
+            tasks = [
+                Task(project, task_name, description, Status.NOT_STARTED, extract_subtasks(description))
+                for project in chosen
+            ]
+            create_tasks(tasks)  # one transaction and one sync for all of them
+            for task in tasks:
+                st.session_state.tasks.add(task)
+            st.success(f"Started '{task_name}' in {len(tasks)} project(s).")
+
+    st.markdown("---")
+    st.markdown("### Template library")
+    st.caption("One step per line as `D<day>: step`, counted from the start date (`D0`), e.g. `D2: passage`. "
+               "Other lines are kept as notes.")
+    for name, steps in templates.items():
+        with st.expander(f"📐 {name} · {len(template_steps(steps))} step(s)"):
+            new_steps = st.text_area("Steps", value=steps, key=f"template-steps-{name}")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("💾 Save", key=f"template-save-{name}"):
+                    replica.save_template(name, new_steps)
+                    st.rerun()
+            with col2:
+                if st.button("🗑️ Delete", key=f"template-delete-{name}"):
+                    replica.delete_template(name)
+                    st.rerun()
+
+    with st.expander("➕ New template"):
+        new_name = st.text_input("Name", key="template-new-name")
+        new_steps = st.text_area("Steps", value="D0: \nD2: \nD7: ", key="template-new-steps")
+        if st.button("💾 Add template"):
+            if new_name and template_steps(new_steps):
+                replica.save_template(new_name, new_steps)
+                st.rerun()
+            else:
+                st.warning("Please give the template a name and at least one D<day>: step.")